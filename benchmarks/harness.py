@@ -0,0 +1,177 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from miros import Event
+from miros import signals
+
+from screenuler.app import GlobalBus
+from screenuler.app import Gui
+from screenuler.app import MoveEventPayload
+from screenuler.app import Statechart
+from screenuler.app import TestableGui
+from screenuler.app import init_state
+from screenuler.recording import read_recording
+from screenuler.recording import replay as replay_recording
+
+
+class TimedStatechart(Statechart):
+    def __init__(self, name: str, bus: GlobalBus, expected: int, instrumented: bool = False, synchronous: bool = False):
+        super().__init__(name=name, bus=bus, instrumented=instrumented, synchronous=synchronous)
+        self.expected = expected
+        self.latencies = []
+        self.done = threading.Event()
+
+    def dispatch(self, e):
+        started = time.perf_counter()
+        super().dispatch(e)
+        self.latencies.append(time.perf_counter() - started)
+
+        if len(self.latencies) >= self.expected:
+            self.done.set()
+
+
+def motion_burst(n: int) -> list:
+    return [(signals.POINTER_MOVED, (i % 750, 37)) for i in range(n)]
+
+
+def key_repeat(n: int) -> list:
+    directions = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+    return [(signals.MOVE, MoveEventPayload(direction=directions[i // 50 % 4], speedup=10)) for i in range(n)]
+
+
+def resize_storm(n: int) -> list:
+    cycle = [signals.SET_SIZE_1, signals.SET_SIZE_2, signals.SET_SIZE_3, signals.SET_SIZE_4, signals.TOGGLE_ORIENTATION]
+    return [(cycle[i % len(cycle)], None) for i in range(n)]
+
+
+scenarios = {
+    'motion': motion_burst,
+    'keys': key_repeat,
+    'resize': resize_storm
+}
+
+
+def load_recording(path: str) -> list:
+    stream = []
+    with open(path) as f:
+        for line in f:
+            name, payload = json.loads(line)
+            if name == 'MOVE':
+                payload = MoveEventPayload(direction=tuple(payload[0]), speedup=payload[1])
+            elif payload is not None:
+                payload = tuple(payload)
+            stream.append((getattr(signals, name), payload))
+    return stream
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def replay(stream: list, real_gui: bool = False, instrumented: bool = False, synchronous: bool = False) -> dict:
+    bus = GlobalBus()
+    statechart = TimedStatechart('benchmark', bus=bus, expected=len(stream), instrumented=instrumented, synchronous=synchronous)
+    gui = Gui(bus=bus) if real_gui else TestableGui(bus=bus)
+    statechart.start_at(init_state)
+
+    def pump():
+        if real_gui:
+            gui.commands.drain()
+            gui.root.update()
+
+    started = time.perf_counter()
+    for i, (signal, payload) in enumerate(stream):
+        while len(statechart.queue) > Statechart.QUEUE_SIZE // 2:
+            pump()
+            time.sleep(0)
+        statechart.post_fifo(Event(signal=signal, payload=payload))
+        if i % 64 == 0:
+            pump()
+
+    while not statechart.done.wait(0.001):
+        pump()
+    pump()
+    elapsed = time.perf_counter() - started
+
+    statechart.stop()
+    if real_gui:
+        gui.root.destroy()
+
+    return {
+        'events': len(stream),
+        'events_per_second': len(stream) / elapsed,
+        'p50_us': percentile(statechart.latencies, 0.50) * 1e6,
+        'p99_us': percentile(statechart.latencies, 0.99) * 1e6
+    }
+
+
+def replay_inputs(path: str, real_gui: bool = False, realtime: bool = False, instrumented: bool = False, synchronous: bool = False) -> dict:
+    with open(path, 'rb') as f:
+        records = list(read_recording(f))
+
+    bus = GlobalBus()
+    statechart = TimedStatechart('benchmark', bus=bus, expected=0, instrumented=instrumented, synchronous=synchronous)
+    gui = Gui(bus=bus) if real_gui else TestableGui(bus=bus)
+    statechart.start_at(init_state)
+
+    def pump():
+        while len(statechart.queue) > Statechart.QUEUE_SIZE // 2:
+            time.sleep(0)
+        if real_gui:
+            gui.flush()
+            gui.root.update()
+
+    started = time.perf_counter()
+    replay_recording(records, gui, realtime=realtime, pump=pump)
+    statechart.drain()
+    pump()
+    elapsed = time.perf_counter() - started
+
+    statechart.stop()
+    if real_gui:
+        gui.root.destroy()
+
+    latencies = statechart.latencies or [0.0]
+    return {
+        'events': len(records),
+        'events_per_second': len(records) / elapsed,
+        'p50_us': percentile(latencies, 0.50) * 1e6,
+        'p99_us': percentile(latencies, 0.99) * 1e6
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='replay input streams through the statechart and report throughput and dispatch latency')
+    parser.add_argument('scenario', nargs='*', default=list(scenarios), help=f'synthetic scenarios: {", ".join(scenarios)}')
+    parser.add_argument('-n', '--events', type=int, default=100_000)
+    parser.add_argument('-r', '--recording', action='append', default=[], help='json lines file of [signal_name, payload] to replay')
+    parser.add_argument('--replay', action='append', default=[], help='binary input log written by screenuler --record, replayed through the gui input handlers')
+    parser.add_argument('--realtime', action='store_true', help='replay --replay logs at their recorded pace instead of as fast as possible')
+    parser.add_argument('--real-gui', action='store_true', help='render through the real Gui, needs a display (xvfb-run)')
+    parser.add_argument('--instrumented', action='store_true')
+    parser.add_argument('--synchronous', action='store_true', help='dispatch on the posting thread instead of the statechart thread')
+    args = parser.parse_args()
+
+    if args.real_gui and sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+        sys.exit('no DISPLAY, run under xvfb-run')
+
+    if args.replay and args.scenario == list(scenarios):
+        args.scenario = []
+
+    streams = [(name, scenarios[name](args.events)) for name in args.scenario]
+    streams += [(os.path.basename(path), load_recording(path)) for path in args.recording]
+
+    results = [(name, replay(stream, real_gui=args.real_gui, instrumented=args.instrumented, synchronous=args.synchronous)) for name, stream in streams]
+    results += [(os.path.basename(path), replay_inputs(path, real_gui=args.real_gui, realtime=args.realtime, instrumented=args.instrumented, synchronous=args.synchronous)) for path in args.replay]
+
+    for name, result in results:
+        print(f'{name:>12}: {result["events"]:8d} events  {result["events_per_second"]:10.0f} events/s  p50 {result["p50_us"]:8.1f} us  p99 {result["p99_us"]:8.1f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import os
+import sys
+import time
+
+from screenuler.app import GlobalBus
+from screenuler.app import Gui
+
+
+def bench(persistent_markers: bool, updates: int, size: int) -> float:
+    gui = Gui(bus=GlobalBus(), persistent_markers=persistent_markers)
+    gui.make_horizontal(size)
+    width, _ = Gui.sizes[size]
+    gui.root.update()
+
+    started = time.perf_counter()
+    for i in range(updates):
+        gui.update_position_markers(i % width)
+        gui.root.update_idletasks()
+    elapsed = time.perf_counter() - started
+
+    gui.root.destroy()
+
+    return elapsed / updates
+
+
+def main():
+    parser = argparse.ArgumentParser(description='per-update cost of Gui.update_position_markers')
+    parser.add_argument('-n', '--updates', type=int, default=5000)
+    parser.add_argument('-s', '--size', type=int, default=max(Gui.sizes))
+    args = parser.parse_args()
+
+    if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+        sys.exit('no DISPLAY, run under xvfb-run')
+
+    recreate = bench(False, args.updates, args.size)
+    persistent = bench(True, args.updates, args.size)
+
+    print(f'recreate:   {recreate * 1e6:8.1f} us/update')
+    print(f'persistent: {persistent * 1e6:8.1f} us/update')
+    print(f'speedup:    {recreate / persistent:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+from screenuler.app import GlobalBus
+from screenuler.app import Gui
+from screenuler.app import Statechart
+from screenuler.app import TestableGui
+from screenuler.app import init_state
+from screenuler.metrics import Metrics
+
+hotkey_cycle = ('SET_SIZE_2', 'TOGGLE_ORIENTATION', 'SET_SIZE_4', 'CYCLE_UNIT', 'SET_SIZE_3', 'TOGGLE_ORIENTATION', 'SET_SIZE_1', 'CYCLE_UNIT')
+
+
+def feed(gui: TestableGui, start: int, count: int):
+    for i in range(start, start + count):
+        now = i / 1000
+
+        if i % 1000 == 999:
+            gui.on_hotkey(hotkey_cycle[i // 1000 % len(hotkey_cycle)], now)
+        elif i % 500 == 0:
+            gui.on_enter(now) if i % 1000 == 0 else gui.on_leave(now)
+        elif i % 97 == 0:
+            direction = ((1, 0), (0, 1), (-1, 0), (0, -1))[i // 97 % 4]
+            gui.on_arrow_press(direction, 10, now)
+            gui.on_arrow_release(direction, now)
+        else:
+            gui.on_motion(i % 740, i % 70, now)
+
+
+def keeps_rising(samples: list, slack: float, window: int = 3) -> bool:
+    tail = samples[-window:]
+    rising = all(a < b for a, b in zip(tail, tail[1:]))
+
+    return rising and samples[-1] - samples[0] > slack
+
+
+def soak(events: int, rounds: int, real_gui: bool = False, instrumented: bool = False, spy_size: int = 0) -> list:
+    bus = GlobalBus()
+    statechart = Statechart('soak', bus=bus, instrumented=instrumented, spy_size=spy_size, synchronous=True, metrics=Metrics())
+    gui = Gui(bus=bus) if real_gui else TestableGui(bus=bus)
+    statechart.start_at(init_state)
+
+    def pump():
+        if real_gui:
+            gui.flush()
+            gui.root.update()
+
+    tracemalloc.start()
+    per_round = events // rounds
+    samples = []
+
+    for r in range(rounds):
+        for start in range(r * per_round, (r + 1) * per_round, 256):
+            feed(gui, start, min(256, (r + 1) * per_round - start))
+            pump()
+
+        gc.collect()
+        memory, _ = tracemalloc.get_traced_memory()
+        items = len(gui.canvas.find_all()) if real_gui else 0
+        samples.append((memory, items))
+
+    tracemalloc.stop()
+    statechart.stop()
+    if real_gui:
+        gui.root.destroy()
+
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description='push a long synthetic session through the statechart and gui, fail if memory or canvas items keep growing')
+    parser.add_argument('-n', '--events', type=int, default=1_000_000)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--slack_kib', type=float, default=256, help='memory growth after the warm-up round that is tolerated')
+    parser.add_argument('--real-gui', action='store_true', help='render through the real Gui and count canvas items, needs a display (xvfb-run)')
+    parser.add_argument('--instrumented', action='store_true')
+    parser.add_argument('--spy_size', type=int, default=500)
+    args = parser.parse_args()
+
+    if args.real_gui and sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+        sys.exit('no DISPLAY, run under xvfb-run')
+
+    started = time.perf_counter()
+    samples = soak(args.events, args.rounds, real_gui=args.real_gui, instrumented=args.instrumented, spy_size=args.spy_size)
+    elapsed = time.perf_counter() - started
+
+    for r, (memory, items) in enumerate(samples):
+        print(f'round {r:3d}: traced {memory / 1024:10.1f} KiB  canvas items {items if args.real_gui else "n/a":>6}')
+    print(f'{args.events} events in {elapsed:.1f} s')
+    if not args.real_gui:
+        print('headless run: canvas items are only counted with --real-gui')
+
+    # the first round builds tick layouts, canvas layers and caches
+    memory = [memory for memory, _ in samples[1:]]
+    items = [items for _, items in samples[1:]]
+
+    failures = []
+    if keeps_rising(memory, args.slack_kib * 1024):
+        failures.append(f'traced memory keeps rising: {memory[0] / 1024:.1f} -> {memory[-1] / 1024:.1f} KiB')
+    if args.real_gui and items and items[-1] > items[0]:
+        failures.append(f'canvas items keep rising: {items[0]} -> {items[-1]}')
+
+    if failures:
+        sys.exit('\n'.join(failures))
+
+
+if __name__ == '__main__':
+    main()
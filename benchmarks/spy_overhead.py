@@ -0,0 +1,69 @@
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+from miros import Event
+from miros import signals
+
+from screenuler.app import GlobalBus
+from screenuler.app import Statechart
+from screenuler.app import TestableGui
+from screenuler.app import init_state
+from screenuler.metrics import Metrics
+
+
+def bench(instrumented: bool, events: int, spy_size: int, trace_memory: bool, with_metrics: bool = False) -> dict:
+    bus = GlobalBus()
+    metrics = Metrics() if with_metrics else None
+    statechart = Statechart('statechart', bus=bus, instrumented=instrumented, spy_size=spy_size, metrics=metrics)
+    TestableGui(bus=bus)
+    statechart.start_at(init_state)
+
+    if trace_memory:
+        tracemalloc.start()
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    memory_before, _ = tracemalloc.get_traced_memory()
+
+    started = time.perf_counter()
+    for i in range(events):
+        e = Event(signal=signals.POINTER_MOVED, payload=(i % 750, 0))
+        if metrics is not None:
+            metrics.posted(e)
+        statechart.dispatch(e)
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    blocks_after = sys.getallocatedblocks()
+    memory_after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    statechart.stop()
+
+    return {
+        'events_per_second': events / elapsed,
+        'block_growth': blocks_after - blocks_before,
+        'growth_kib': (memory_after - memory_before) / 1024,
+        'spy_lines': len(statechart.spy() or [])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='statechart dispatch cost with and without spy instrumentation and metrics')
+    parser.add_argument('-n', '--events', type=int, default=1_000_000)
+    parser.add_argument('--spy_size', type=int, default=500)
+    parser.add_argument('--tracemalloc', action='store_true', help='also report traced memory growth (much slower)')
+    args = parser.parse_args()
+
+    for name, instrumented, with_metrics in (('instrumented', True, False), ('production', False, False), ('metrics', False, True)):
+        result = bench(instrumented, args.events, args.spy_size, args.tracemalloc, with_metrics)
+        line = f'{name:>12}: {result["events_per_second"]:10.0f} events/s  allocated blocks {result["block_growth"]:+8d}  spy lines {result["spy_lines"]}'
+        if args.tracemalloc:
+            line += f'  traced growth {result["growth_kib"]:8.1f} KiB'
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
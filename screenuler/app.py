@@ -1,9 +1,16 @@
+from screenuler.startup import startup_profile
+
 import argparse
+import sys
+import time
 import tkinter
 import typing
+from collections import OrderedDict
+from collections import deque
 from collections import namedtuple
 
 from miros import ActiveObject
+from miros import HsmWithQueues
 from miros import return_status
 from miros import Event
 from miros import signals
@@ -12,6 +19,31 @@ from miros import spy_on
 MoveEventPayload = namedtuple('MoveEventPayload', ['direction', 'speedup'])
 
 import screenuler.helpers as helpers
+import screenuler.loupe as loupe
+import screenuler.metrics as metrics
+from screenuler.commands import GuiCommandQueue
+from screenuler.frames import FramePacer
+from screenuler.geometry import WindowGeometry
+from screenuler.inputs import MoveAccumulator
+from screenuler.layout import TickLayout
+from screenuler.layout import format_position
+from screenuler.layout import tick_layout
+from screenuler.layout import units
+from screenuler.inputs import PointerCoalescer
+from screenuler.marker import ExternalMarkerUpdater
+from screenuler.metrics import Metrics
+from screenuler.recording import ENTER
+from screenuler.recording import HOTKEY
+from screenuler.recording import LEAVE
+from screenuler.recording import MOTION
+from screenuler.recording import PRESS
+from screenuler.recording import RELEASE
+from screenuler.recording import Recorder
+from screenuler.recording import hotkeys
+from screenuler.ticks import TickPool
+from screenuler.ticks import visible_span
+
+startup_profile.mark('imports')
 
 class GlobalBus:
     def __init__(self):
@@ -26,16 +58,116 @@ class GlobalBus:
 
 
 class Statechart(ActiveObject):
-    def __init__(self, name: str, bus: GlobalBus):
+    def __init__(self, name: str, bus: GlobalBus, instrumented: bool = True, spy_size: int = 0, synchronous: bool = False, metrics: typing.Optional[Metrics] = None, call_soon: typing.Optional[typing.Callable] = None):
         super().__init__(name=name)
+        self.instrumented = instrumented
+        self.metrics = metrics
         self.bus = bus
+
+        if spy_size:
+            self.full.spy = deque(maxlen=spy_size)
+            self.full.trace = deque(maxlen=spy_size)
+
+        self.synchronous = synchronous
+        self.dispatching = False
+        self.call_soon = call_soon
+        self.drain_pending = False
+        if synchronous:
+            self.queue = deque(maxlen=self.__class__.QUEUE_SIZE)
+
         self.bus.register_statechart(self)
 
+    def start_at(self, initial_state):
+        if self.synchronous:
+            HsmWithQueues.start_at(self, initial_state)
+        else:
+            super().start_at(initial_state)
+
+    def stop(self):
+        if self.synchronous:
+            self.queue.clear()
+        else:
+            super().stop()
+
+    def post_fifo(self, e, period=None, times=None, deferred=None):
+        thread_id = super().post_fifo(e, period=period, times=times, deferred=deferred)
+        if self.synchronous and period is None:
+            self._request_drain()
+        return thread_id
+
+    def post_lifo(self, e, period=None, times=None, deferred=None):
+        thread_id = super().post_lifo(e, period=period, times=times, deferred=deferred)
+        if self.synchronous and period is None:
+            self._request_drain()
+        return thread_id
+
+    def _request_drain(self):
+        if self.call_soon is None:
+            self.drain()
+        elif not self.drain_pending:
+            self.drain_pending = True
+            self.call_soon(self._drain_soon)
+
+    def _drain_soon(self):
+        self.drain_pending = False
+        self.drain()
+
+    def dispatch(self, e):
+        if self.metrics is None:
+            return super().dispatch(e)
+
+        started = self.metrics.dispatching(e, len(self.queue))
+        result = super().dispatch(e)
+        self.metrics.dispatched(e, started)
+        return result
+
+    def drain(self, timeout: typing.Optional[float] = None) -> bool:
+        if self.synchronous:
+            if not self.dispatching:
+                self.dispatching = True
+                try:
+                    self.complete_circuit()
+                finally:
+                    self.dispatching = False
+            return True
+
+        tasks = self.locking_deque.locking_queue
+        with tasks.all_tasks_done:
+            return tasks.all_tasks_done.wait_for(lambda: tasks.unfinished_tasks == 0, timeout)
+
 
 class TestableGui:
     def __init__(self, bus: GlobalBus):
         self.bus = bus
         self.bus.register_gui(self)
+        self.recorder = None
+
+    def _record(self, now: float, kind: int, a: int = 0, b: int = 0, c: int = 0):
+        if self.recorder is not None:
+            self.recorder.record(now, kind, a, b, c)
+
+    def on_hotkey(self, name: str, now: float = 0.0):
+        self._record(now, HOTKEY, hotkeys.index(name))
+        self.send_event(signal=getattr(signals, name))
+
+    def on_arrow_press(self, direction: typing.Tuple, speedup: int, now: float = 0.0):
+        self._record(now, PRESS, *direction, speedup)
+        self.send_event(signal=signals.MOVE, payload=MoveEventPayload(direction=direction, speedup=speedup))
+
+    def on_arrow_release(self, direction: typing.Tuple, now: float = 0.0):
+        self._record(now, RELEASE, *direction)
+
+    def on_motion(self, x: int, y: int, now: float = 0.0):
+        self._record(now, MOTION, x, y)
+        self.send_event(signal=signals.POINTER_MOVED, payload=(x, y))
+
+    def on_enter(self, now: float = 0.0):
+        self._record(now, ENTER)
+        self.send_event(signal=signals.SHOW_EXTERNAL_MARKER)
+
+    def on_leave(self, now: float = 0.0):
+        self._record(now, LEAVE)
+        self.send_event(signal=signals.HIDE_EXTERNAL_MARKER)
 
     def run(self):
         pass
@@ -43,6 +175,12 @@ class TestableGui:
     def quit(self):
         pass
 
+    def show(self):
+        pass
+
+    def hide(self):
+        pass
+
     def make_horizontal(self, size: int = 1):
         pass
 
@@ -55,8 +193,105 @@ class TestableGui:
     def update_position_markers(self, pos, direction='horizontal'):
         pass
 
+    def show_external_marker(self):
+        pass
+
+    def hide_external_marker(self):
+        pass
+
+    def cycle_unit(self, steps: int = 1):
+        pass
+
+    def toggle_loupe(self, times: int = 1):
+        pass
+
+    def toggle_snap(self, times: int = 1):
+        pass
+
+    def flush(self) -> int:
+        return 0
+
+    def destroy(self):
+        pass
+
     def send_event(self, signal: signals, payload: typing.Any = None):
-        self.bus.statechart.post_fifo(Event(signal=signal, payload=payload))
+        e = Event(signal=signal, payload=payload)
+        if self.bus.statechart.metrics is not None:
+            self.bus.statechart.metrics.posted(e)
+        self.bus.statechart.post_fifo(e)
+
+
+class CulledTickLayer:
+    def __init__(self, gui: 'Gui', layout: TickLayout, length: int, direction='horizontal'):
+        self.gui = gui
+        self.layout = layout
+        self.length = length
+        self.direction = direction
+        self.span = None
+
+        canvas = gui.canvas
+        positions, lengths = layout.positions, layout.lengths
+        label_positions, labels = layout.label_positions, layout.labels
+        self.ticks = TickPool(
+            create=lambda i: canvas.create_rectangle(*gui._tick_coords(positions[i], direction, lengths[i]), fill=gui.mark_color, outline=gui.mark_color),
+            place=lambda item, i: (canvas.coords(item, *gui._tick_coords(positions[i], direction, lengths[i])), canvas.itemconfigure(item, state='normal')),
+            hide=lambda item: canvas.itemconfigure(item, state='hidden')
+        )
+        self.labels = TickPool(
+            create=lambda i: gui._draw_label(label_positions[i], direction, text=labels[i]),
+            place=lambda item, i: (canvas.coords(item, *gui._label_coords(label_positions[i], direction)), canvas.itemconfigure(item, text=labels[i], state='normal')),
+            hide=lambda item: canvas.itemconfigure(item, state='hidden')
+        )
+
+    def render(self, offset: int, viewport: int):
+        span = visible_span(offset, self.length, viewport, margin=Gui.label_step)
+        if span == self.span:
+            return
+
+        self.span = span
+        self.ticks.render(self.layout.tick_range(*span))
+        self.labels.render(self.layout.label_range(*span))
+        self.gui._raise_position_markers()
+
+    def clear(self):
+        self.span = None
+        self.ticks.clear()
+        self.labels.clear()
+
+    def destroy(self):
+        self.span = None
+        self.gui.canvas.delete(*self.ticks.drain(), *self.labels.drain())
+
+
+class TickImageCache:
+    def __init__(self, master: tkinter.Misc, max_size: int = 32):
+        self.master = master
+        self.max_size = max_size
+        self.images = OrderedDict()
+
+    def get(self, layout: TickLayout, direction: str, color: str) -> tkinter.PhotoImage:
+        key = (layout.key, direction, color)
+        if key in self.images:
+            self.images.move_to_end(key)
+        else:
+            self.images[key] = self._render(layout, direction, color)
+            # layers that still show an evicted image hold their own reference to it
+            while len(self.images) > self.max_size:
+                self.images.popitem(last=False)
+        return self.images[key]
+
+    def _render(self, layout: TickLayout, direction: str, color: str) -> tkinter.PhotoImage:
+        pixel = '{{' + color + '}}'
+        length = layout.positions[-1] + 1
+        if direction == 'horizontal':
+            image = tkinter.PhotoImage(master=self.master, width=length, height=26)
+            for pos, tick in zip(layout.positions, layout.lengths):
+                image.put(pixel, to=(pos, 0, pos + 1, tick + 1))
+        else:
+            image = tkinter.PhotoImage(master=self.master, width=26, height=length)
+            for pos, tick in zip(layout.positions, layout.lengths):
+                image.put(pixel, to=(25 - tick, pos, 26, pos + 1))
+        return image
 
 
 class Gui(TestableGui):
@@ -67,21 +302,68 @@ class Gui(TestableGui):
     }
 
     default_size = 1
-
-    def __init__(self, bus: GlobalBus, background='red', mark_color='black', position_color='white'):
+    full_size = 4
+
+    label_step = 50
+    max_static_ticks = 500
+    max_tick_layers = 12
+
+    metrics_overlay_interval = 250
+
+    key_bindings = (
+        ('<Control-q>', 'SHUTDOWN'),
+        ('<Escape>', 'SHUTDOWN'),
+        ('<Control-KeyRelease-t>', 'TOGGLE_ORIENTATION'),
+        ('<Control-s>', 'SET_SIZE_1'),
+        ('<Control-m>', 'SET_SIZE_2'),
+        ('<Control-l>', 'SET_SIZE_3'),
+        ('<Control-f>', 'SET_SIZE_4'),
+        ('<Control-u>', 'CYCLE_UNIT'),
+        ('<Control-g>', 'TOGGLE_LOUPE'),
+        ('<Control-e>', 'TOGGLE_SNAP')
+    )
+
+    def __init__(self, bus: GlobalBus, background='red', mark_color='black', position_color='white', pointer_interval: int = 16, persistent_markers: bool = True, fps: float = 60, length: int = 0, tick_step: int = 10, move_interval: int = 16, acceleration: float = 20.0, on_first_paint: typing.Optional[typing.Callable] = None, master: typing.Optional[tkinter.Misc] = None, tick_images: typing.Optional[TickImageCache] = None, on_quit: typing.Optional[typing.Callable] = None, unit: str = 'px', dpi: float = 0, zoom: float = 1.0, schedule: typing.Optional[typing.Callable] = None):
         super().__init__(bus=bus)
 
+        self.on_first_paint = on_first_paint
+        self.on_quit = on_quit
+        self.deferred = deque()
+
+        self.on_dirty = self.request_frame
+        self.frame_scheduled = False
+        self.commands = GuiCommandQueue(self, on_dirty=self._mark_dirty)
+        self.frame_pacer = FramePacer(fps=fps)
+        self.bus.register_gui(self.commands)
+
         self.background = background
         self.mark_color = mark_color
         self.position_color = position_color
 
-        self.canvas_figures = []
+        self.length = length
+        self.tick_step = tick_step
+        self.unit = unit
+        self.zoom = zoom
+        self.tick_layers = OrderedDict()
+        self.tick_layer_images = {}
+        self.visible_tick_layer = None
+        self.visible_tick_size = None
+        self.persistent_markers = persistent_markers
         self.position_marker = None
         self.position_text = None
+        self.position_marker_direction = None
+        self.metrics_overlay = None
 
-        self.root = tkinter.Tk()
+        self.geometry = WindowGeometry()
+
+        self.root = tkinter.Tk() if master is None else tkinter.Toplevel(master)
+        # timers (frames, coalescing, acceleration, debounce) run on Tk unless a runtime supplies its own scheduler
+        self.schedule = schedule or self.root.after
+        self.tick_images = tick_images or TickImageCache(self.root)
         self.canvas = tkinter.Canvas(self.root, background=self.background)
-        self.external_position_marker = tkinter.Toplevel(background=self.position_color)
+        self.screen_size = (self.root.winfo_screenwidth(), self.root.winfo_screenheight())
+        self.dpi = dpi or self.root.winfo_fpixels('1i')
+        self.external_position_marker = None
 
         self.root.title('screenuler 🤡')
         self.root.resizable(False, False)
@@ -90,61 +372,295 @@ class Gui(TestableGui):
         self.root.rowconfigure(0, weight=1)
         self.canvas.grid(column=0, row=0, sticky='nesw')
 
-        self.external_position_marker.overrideredirect(True)
-        self.external_position_marker.geometry('0x0+0+0')
+        self.client_offset = (0, 0)
+        self.external_marker = ExternalMarkerUpdater(
+            apply_geometry=self._apply_external_marker_geometry,
+            apply_visible=self._apply_external_marker_visible,
+            schedule=self.schedule
+        )
+
+        self.snap_enabled = False
+        self.edge_index = None
+
+        self.loupe = None
+        self.loupe_enabled = False
+        self.loupe_window = None
+        self.loupe_source = None
+        self.loupe_image = None
+        self.loupe_point = None
+        self.loupe_placement = ExternalMarkerUpdater(
+            apply_geometry=self._apply_loupe_geometry,
+            apply_visible=self._apply_loupe_visible,
+            schedule=self.schedule
+        )
+
+        self.pointer_coalescer = PointerCoalescer(
+            emit=lambda pos: self.send_event(signal=signals.POINTER_MOVED, payload=pos),
+            schedule=self.schedule,
+            interval=pointer_interval
+        )
+        self.move_accumulator = MoveAccumulator(
+            emit=lambda delta: self.send_event(signal=signals.MOVE, payload=MoveEventPayload(direction=delta, speedup=1)),
+            schedule=self.schedule,
+            interval=move_interval,
+            acceleration=acceleration
+        )
 
     def bind_events(self):
-        self.root.bind('<Control-q>', lambda _: self.send_event(signal=signals.SHUTDOWN))
-        self.root.bind('<Escape>', lambda _: self.send_event(signal=signals.SHUTDOWN))
+        for sequence, name in Gui.key_bindings:
+            self.root.bind(sequence, lambda e, n=name: self.on_hotkey(n, e.time / 1000))
+
+        self.root.bind('<Control-d>', lambda _: self.dump_metrics())
+        self.root.bind('<Control-o>', lambda _: self.toggle_metrics_overlay())
+
+        for keysym, direction in (('Left', (-1, 0)), ('Right', (1, 0)), ('Up', (0, -1)), ('Down', (0, 1))):
+            self.root.bind(f'<{keysym}>', lambda e, d=direction: self.on_arrow_press(d, helpers.is_speedup_modifier_active(e.state), e.time / 1000))
+            self.root.bind(f'<KeyRelease-{keysym}>', lambda e, d=direction: self.on_arrow_release(d, e.time / 1000))
+
+        self.root.bind('<Motion>', lambda e: self.on_motion(e.x, e.y, e.time / 1000))
+
+        self.root.bind('<Enter>', lambda e: self.on_enter(e.time / 1000))
 
-        self.root.bind('<Control-KeyRelease-t>', lambda _: self.send_event(signal=signals.TOGGLE_ORIENTATION))
-        self.root.bind('<Control-s>', lambda _: self.send_event(signal=signals.SET_SIZE_1))
-        self.root.bind('<Control-m>', lambda _: self.send_event(signal=signals.SET_SIZE_2))
-        self.root.bind('<Control-l>', lambda _: self.send_event(signal=signals.SET_SIZE_3))
+        self.root.bind('<Leave>', lambda e: self.on_leave(e.time / 1000))
 
-        self.root.bind('<Left>', lambda e: self.send_event(signal=signals.MOVE, payload=MoveEventPayload(direction=(-1, 0), speedup=helpers.is_speedup_modifier_active(e.state))))
+        self.root.bind('<Configure>', self._on_configure)
 
-        self.root.bind('<Right>', lambda e: self.send_event(signal=signals.MOVE, payload=MoveEventPayload(direction=(1, 0), speedup=helpers.is_speedup_modifier_active(e.state))))
+        self.canvas.bind('<Expose>', self._on_expose)
 
-        self.root.bind('<Up>', lambda e: self.send_event(signal=signals.MOVE, payload=MoveEventPayload(direction=(0, -1), speedup=helpers.is_speedup_modifier_active(e.state))))
+    def on_arrow_press(self, direction: typing.Tuple, speedup: int, now: float = 0.0):
+        self._record(now, PRESS, *direction, speedup)
+        self.move_accumulator.press(direction, speedup, now)
 
-        self.root.bind('<Down>', lambda e: self.send_event(signal=signals.MOVE, payload=MoveEventPayload(direction=(0, 1), speedup=helpers.is_speedup_modifier_active(e.state))))
+    def on_arrow_release(self, direction: typing.Tuple, now: float = 0.0):
+        self._record(now, RELEASE, *direction)
+        self.move_accumulator.release(direction, now)
 
-        self.root.bind('<Motion>', lambda e: self.send_event(signal=signals.POINTER_MOVED, payload=(e.x, e.y)))
+    def on_motion(self, x: int, y: int, now: float = 0.0):
+        self._record(now, MOTION, x, y)
+        self.pointer_coalescer.push((x, y))
 
-        self.root.bind('<Enter>', lambda e: self.send_event(signal=signals.SHOW_EXTERNAL_MARKER))
+    def _on_expose(self, _):
+        self.canvas.unbind('<Expose>')
+        self.root.after_idle(self._first_paint)
 
-        self.root.bind('<Leave>', lambda e: self.send_event(signal=signals.HIDE_EXTERNAL_MARKER))
+    def _first_paint(self):
+        if self.on_first_paint is not None:
+            self.on_first_paint()
+
+        self.deferred.append(self._create_external_marker)
+        for direction in ('horizontal', 'vertical'):
+            for size in Gui.sizes:
+                self.deferred.append(lambda d=direction, s=size: self._prewarm_tick_layer(s, d))
+        self._run_deferred()
+
+    def _run_deferred(self):
+        if self.deferred:
+            self.deferred.popleft()()
+            self.root.after_idle(self._run_deferred)
+
+    def _create_external_marker(self):
+        self.external_position_marker = tkinter.Toplevel(self.root, background=self.position_color)
+        self.external_position_marker.overrideredirect(True)
+        self.external_position_marker.geometry(self.external_marker.applied_geometry or '0x0+0+0')
+        self._apply_external_marker_visible(bool(self.external_marker.applied_visible))
+
+    def _apply_external_marker_geometry(self, geometry: str):
+        if self.external_position_marker is not None:
+            self.external_position_marker.geometry(geometry)
+
+    def _apply_external_marker_visible(self, visible: bool):
+        if self.external_position_marker is not None:
+            self.external_position_marker.state('normal' if visible else 'withdrawn')
+
+    def flush(self) -> int:
+        executed = self.commands.drain()
+        if self.bus.statechart.metrics is not None:
+            self.bus.statechart.metrics.rendered(executed > 0)
+        return executed
+
+    def dump_metrics(self):
+        if self.bus.statechart.metrics is not None:
+            metrics.dump(self.bus.statechart.metrics.summary())
+
+    def toggle_metrics_overlay(self):
+        if self.metrics_overlay is not None:
+            self.canvas.delete(self.metrics_overlay)
+            self.metrics_overlay = None
+        elif self.bus.statechart.metrics is not None:
+            self.metrics_overlay = self.canvas.create_text(2, 2, anchor='nw', justify='left', font=('TkFixedFont', 7), fill=self.position_color)
+            self._refresh_metrics_overlay()
+
+    def _refresh_metrics_overlay(self):
+        if self.metrics_overlay is None:
+            return
+
+        self.canvas.itemconfigure(self.metrics_overlay, text=self.bus.statechart.metrics.overlay_text())
+        self.canvas.tag_raise(self.metrics_overlay)
+        self.schedule(Gui.metrics_overlay_interval, self._refresh_metrics_overlay)
+
+    def _mark_dirty(self):
+        self.on_dirty()
+
+    def request_frame(self):
+        if not self.frame_scheduled:
+            self.frame_scheduled = True
+            self.schedule(0, self._render_frame)
+
+    def _render_frame(self):
+        self.frame_pacer.begin(time.perf_counter())
+        flushed = self.flush() > 0
+        delay = self.frame_pacer.end(time.perf_counter(), flushed)
+
+        if flushed:
+            self.schedule(delay, self._render_frame)
+        else:
+            # idle until the command queue marks the gui dirty again
+            self.frame_pacer.stop()
+            self.frame_scheduled = False
 
     def run(self):
         self.bind_events()
+        self.frame_scheduled = True
+        self._render_frame()
         self.root.mainloop()
 
     def quit(self):
-        self.root.quit()
+        if self.on_quit is not None:
+            self.on_quit(self)
+        else:
+            self.root.quit()
+
+    def destroy(self):
+        self.deferred.clear()
+        self.external_position_marker = None
+        self.loupe_window = None
+        self.metrics_overlay = None
+        self.root.destroy()
+
+    def show(self):
+        self.root.deiconify()
+
+    def hide(self):
+        self.root.withdraw()
+        self.external_marker.set_visible(False)
+        self.loupe_placement.set_visible(False)
 
     def _set_geometry(self, width: int, height: int, x: int, y: int):
-        self.root.geometry(f'{width}x{height}+{x}+{y}')
+        self.root.geometry(self.geometry.request(width, height, x, y))
+
+    def _on_configure(self, e):
+        if e.widget is not self.root:
+            return
 
-    def _clear_canvas_figures(self):
-        while self.canvas_figures:
-            self.canvas.delete(self.canvas_figures.pop())
+        self.client_offset = (self.root.winfo_rootx() - e.x, self.root.winfo_rooty() - e.y)
+        if self.geometry.configure(e.width, e.height, e.x, e.y):
+            self._render_visible_ticks()
 
-    def _draw_mark(self, pos, direction='horizontal'):
+    def _tick_coords(self, pos, direction='horizontal', length=25) -> typing.Tuple:
         if direction == 'horizontal':
-            fig = self.canvas.create_rectangle(pos, 0, pos, 25, fill=self.mark_color, outline=self.mark_color)
-            self.canvas_figures.append(fig)
-            if pos % 50 == 0:
-                fig = self.canvas.create_text(pos, 40, justify='center', text=pos, angle=90.0, fill=self.mark_color)
-                self.canvas_figures.append(fig)
-        elif direction == 'vertical':
-            fig = self.canvas.create_rectangle(50, pos, 75, pos, fill=self.mark_color, outline=self.mark_color)
-            self.canvas_figures.append(fig)
-            if pos % 50 == 0:
-                fig = self.canvas.create_text(25, pos, justify='center', text=pos, fill=self.mark_color)
-                self.canvas_figures.append(fig)
+            return pos, 0, pos, length
+        return 75 - length, pos, 75, pos
 
-    def update_position_markers(self, pos, direction='horizontal'):
+    def _label_coords(self, pos, direction='horizontal') -> typing.Tuple:
+        if direction == 'horizontal':
+            return pos, 40
+        return 25, pos
+
+    def _draw_label(self, pos, direction='horizontal', tag=None, state='normal', text=None):
+        angle = 90.0 if direction == 'horizontal' else 0.0
+        return self.canvas.create_text(*self._label_coords(pos, direction), justify='center', text=pos if text is None else text, angle=angle, fill=self.mark_color, tags=tag, state=state)
+
+    def _ruler_size(self, size: int, direction='horizontal') -> typing.Tuple:
+        if size == Gui.full_size:
+            length = self.length or self.screen_size[0 if direction == 'horizontal' else 1]
+            return length, Gui.sizes[Gui.default_size][1]
+        return Gui.sizes.get(size, Gui.sizes[Gui.default_size])
+
+    def _hide_tick_layer(self, tag):
+        layer = self.tick_layers[tag]
+        if layer is None:
+            self.canvas.itemconfigure(tag, state='hidden')
+        else:
+            layer.clear()
+
+    def _tick_layout(self, length: int) -> TickLayout:
+        return tick_layout(length, self.unit, self.dpi, self.zoom, self.tick_step)
+
+    def _tick_layer_tag(self, size: int, direction='horizontal') -> str:
+        return f'ticks-{direction}-{size}-{self.unit}'
+
+    def _build_tick_layer(self, tag: str, length: int, direction='horizontal', state='normal'):
+        layout = self._tick_layout(length)
+        if len(layout) > Gui.max_static_ticks:
+            self.tick_layers[tag] = CulledTickLayer(self, layout, length, direction)
+        else:
+            image = self.tick_images.get(layout, direction, self.mark_color)
+            self.canvas.create_image(*self._tick_coords(0, direction)[:2], image=image, anchor='nw', tags=tag, state=state)
+            for pos, text in zip(layout.label_positions, layout.labels):
+                self._draw_label(pos, direction, tag, state, text)
+            self.tick_layers[tag] = None
+            self.tick_layer_images[tag] = image
+            self._raise_position_markers()
+
+        self._evict_tick_layers()
+
+    def _evict_tick_layers(self):
+        excess = len(self.tick_layers) - Gui.max_tick_layers
+        if excess <= 0:
+            return
+
+        # least recently shown first, the visible layer is never dropped
+        for tag in [tag for tag in self.tick_layers if tag != self.visible_tick_layer][:excess]:
+            layer = self.tick_layers.pop(tag)
+            if layer is None:
+                self.canvas.delete(tag)
+                del self.tick_layer_images[tag]
+            else:
+                layer.destroy()
+
+    def _prewarm_tick_layer(self, size: int, direction='horizontal'):
+        tag = self._tick_layer_tag(size, direction)
+        if tag not in self.tick_layers:
+            self._build_tick_layer(tag, self._ruler_size(size, direction)[0], direction, state='hidden')
+
+    def _show_tick_layer(self, length: int, size: int, direction='horizontal'):
+        tag = self._tick_layer_tag(size, direction)
+        self.visible_tick_size = (size, direction)
+        if tag == self.visible_tick_layer:
+            return
+
+        if self.visible_tick_layer is not None:
+            self._hide_tick_layer(self.visible_tick_layer)
+
+        self.visible_tick_layer = tag
+        if tag not in self.tick_layers:
+            self._build_tick_layer(tag, length, direction)
+        else:
+            self.tick_layers.move_to_end(tag)
+            if self.tick_layers[tag] is None:
+                self.canvas.itemconfigure(tag, state='normal')
+
+        self._render_visible_ticks()
+
+    def _render_visible_ticks(self):
+        layer = self.tick_layers.get(self.visible_tick_layer)
+        if layer is None:
+            return
+
+        if layer.direction == 'horizontal':
+            layer.render(self.geometry.x, self.screen_size[0])
+        else:
+            layer.render(self.geometry.y, self.screen_size[1])
+
+    def _position_text(self, pos) -> str:
+        return format_position(pos, self.unit, self.dpi, self.zoom)
+
+    def _position_marker_coords(self, pos, direction='horizontal') -> typing.Tuple:
+        if direction == 'horizontal':
+            return (pos, 0, pos, 50), (15, 50)
+        return (25, pos, 75, pos), (15, 25)
+
+    def _recreate_position_markers(self, pos, direction='horizontal'):
         if self.position_marker:
             self.canvas.delete(self.position_marker)
             self.position_marker = None
@@ -153,60 +669,260 @@ class Gui(TestableGui):
             self.canvas.delete(self.position_text)
             self.position_text = None
 
+        marker_coords, text_coords = self._position_marker_coords(pos, direction)
+        self.position_marker = self.canvas.create_rectangle(*marker_coords, fill=self.position_color, outline=self.position_color)
+        self.position_text = self.canvas.create_text(*text_coords, text=self._position_text(pos), justify='center', fill=self.position_color)
+
+    def _move_position_markers(self, pos, direction='horizontal'):
+        marker_coords, text_coords = self._position_marker_coords(pos, direction)
+
+        if self.position_marker is None:
+            self.position_marker = self.canvas.create_rectangle(*marker_coords, fill=self.position_color, outline=self.position_color, tags='position_marker')
+            self.position_text = self.canvas.create_text(*text_coords, text=self._position_text(pos), justify='center', fill=self.position_color, tags='position_marker')
+        else:
+            self.canvas.coords(self.position_marker, *marker_coords)
+            self.canvas.itemconfigure(self.position_text, text=self._position_text(pos))
+            if direction != self.position_marker_direction:
+                self.canvas.coords(self.position_text, *text_coords)
+
+        self.position_marker_direction = direction
+
+    def _raise_position_markers(self):
+        if self.persistent_markers and self.position_marker is not None:
+            self.canvas.tag_raise('position_marker')
+
+    def _marker_origin(self, pos: int, direction='horizontal') -> typing.Tuple[int, int]:
+        x, y = self.geometry.position
+        if direction == 'horizontal':
+            return x + self.client_offset[0] + pos, y - 25
+        return x + 75, y + self.client_offset[1] + pos
+
+    def _sample_point(self, pos: int, direction='horizontal') -> typing.Tuple[int, int]:
+        # the pixel just past the outer end of the external marker, so neither the marker nor the ruler is captured
+        x, y = self._marker_origin(pos, direction)
         if direction == 'horizontal':
-            self.position_marker = self.canvas.create_rectangle(pos, 0, pos, 50, fill=self.position_color, outline=self.position_color)
-            self.position_text = self.canvas.create_text(15, 50, text=pos, justify='center', fill=self.position_color)
+            return x, y - 1
+        return x + 50, y
+
+    def _edge_strip(self, direction='horizontal') -> typing.Tuple:
+        left, top = self._sample_point(0, direction)
+        width, height = self.geometry.size
+        if direction == 'horizontal':
+            return left, top, width, 1
+        return left, top, 1, height
+
+    def toggle_snap(self, times: int = 1):
+        if times % 2 == 0:
+            return
 
-            x, y = helpers.get_position(self.root.geometry())
-            self.external_position_marker.geometry(f'+{self.root.winfo_pointerx()}+{y-25}')
-        elif direction == 'vertical':
-            self.position_marker = self.canvas.create_rectangle(25, pos, 75, pos, fill=self.position_color, outline=self.position_color)
-            self.position_text = self.canvas.create_text(15, 25, text=pos, justify='center', fill=self.position_color)
+        if not loupe.available():
+            print('snapping needs Pillow to capture the screen: pip install pillow', file=sys.stderr)
+            return
 
-            x, y = helpers.get_position(self.root.geometry())
-            self.external_position_marker.geometry(f'+{x+75}+{self.root.winfo_pointery()}')
+        if self.edge_index is None:
+            from screenuler.edges import EdgeIndex
+            self.edge_index = EdgeIndex(capture=loupe.grab_screen)
+
+        self.snap_enabled = not self.snap_enabled
+        self.edge_index.invalidate()
+
+    def update_position_markers(self, pos, direction='horizontal'):
+        if self.snap_enabled:
+            pos = self.edge_index.snap(pos, self._edge_strip(direction))
+
+        if self.persistent_markers:
+            self._move_position_markers(pos, direction)
+        else:
+            self._recreate_position_markers(pos, direction)
+
+        self.external_marker.move_to(*self._marker_origin(pos, direction))
+        self.loupe_point = self._sample_point(pos, direction)
+
+        self._update_loupe()
+
+    def _create_loupe(self):
+        self.loupe = loupe.Loupe(capture=loupe.grab_screen)
+        size, center = self.loupe.size, self.loupe.radius * self.loupe.factor
+
+        # Tk zooms the small capture into the window's image, so no scaled frame crosses into Tcl
+        self.loupe_source = tkinter.PhotoImage(master=self.root, width=self.loupe.source_size, height=self.loupe.source_size)
+        self.loupe_image = tkinter.PhotoImage(master=self.root, width=size, height=size)
+        self.loupe_window = tkinter.Toplevel(self.root, background=self.background)
+        self.loupe_window.overrideredirect(True)
+        self.loupe_window.state('withdrawn')
+
+        canvas = tkinter.Canvas(self.loupe_window, width=size, height=size, highlightthickness=0, background=self.background)
+        canvas.create_image(0, 0, image=self.loupe_image, anchor='nw')
+        canvas.create_rectangle(center - 1, center - 1, center + self.loupe.factor, center + self.loupe.factor, outline=self.position_color)
+        canvas.pack()
+
+    def _apply_loupe_geometry(self, geometry: str):
+        if self.loupe_window is not None:
+            self.loupe_window.geometry(geometry)
+
+    def _apply_loupe_visible(self, visible: bool):
+        if self.loupe_window is not None:
+            self.loupe_window.state('normal' if visible else 'withdrawn')
+
+    def _update_loupe(self):
+        if not self.loupe_enabled or self.loupe_point is None:
+            return
+
+        x, y = self.loupe_point
+        if self.loupe.update(x, y):
+            self.loupe_source.configure(data=self.loupe.source_ppm())
+            self.loupe_image.tk.call(self.loupe_image, 'copy', self.loupe_source, '-zoom', self.loupe.factor)
+
+        self.loupe_placement.resize(self.loupe.size, self.loupe.size)
+        if self.position_marker_direction == 'vertical':
+            self.loupe_placement.move_to(self.geometry.x - self.loupe.size - 16, y + 16)
+        else:
+            self.loupe_placement.move_to(x + 16, self.geometry.y + self.client_offset[1] + self.geometry.height + 16)
+
+    def toggle_loupe(self, times: int = 1):
+        if times % 2 == 0:
+            return
+
+        if self.loupe is None:
+            if not loupe.available():
+                print('the loupe needs Pillow to capture the screen: pip install pillow', file=sys.stderr)
+                return
+            self._create_loupe()
+
+        self.loupe_enabled = not self.loupe_enabled
+        self.loupe_placement.set_visible(self.loupe_enabled)
+
+        if self.loupe_enabled:
+            self.external_marker.set_visible(False)
+            self.loupe.reset()
+            self._update_loupe()
+
+    def cycle_unit(self, steps: int = 1):
+        self.unit = units[(units.index(self.unit) + steps) % len(units)]
+
+        if self.visible_tick_size is not None:
+            size, direction = self.visible_tick_size
+            self._show_tick_layer(self._ruler_size(size, direction)[0], size, direction)
 
     def show_external_marker(self):
-        self.external_position_marker.state('normal')
+        if not self.loupe_enabled:
+            self.external_marker.set_visible(True)
 
     def hide_external_marker(self):
-        self.external_position_marker.state('withdrawn')
+        self.external_marker.set_visible(False)
 
     def make_horizontal(self, size: int = 1):
-        geometry = self.root.geometry()
-        x, y = helpers.get_position(geometry)
-        width, height = Gui.sizes.get(size, Gui.sizes.get(Gui.default_size))
+        x, y = self.geometry.position
+        size = size if size in Gui.sizes or size == Gui.full_size else Gui.default_size
+        width, height = self._ruler_size(size)
         self._set_geometry(width, height, x, y)
 
-        self._clear_canvas_figures()
+        self._show_tick_layer(width, size)
 
-        for pos in range(0, width + 50, 10):
-            self._draw_mark(pos)
-
-        self.external_position_marker.geometry('1x50+50+50')
+        self.external_marker.resize(1, 50)
 
     def make_vertical(self, size: int = 1):
-        geometry = self.root.geometry()
-        x, y = helpers.get_position(geometry)
-        height, width = Gui.sizes.get(size, Gui.sizes.get(Gui.default_size))
+        x, y = self.geometry.position
+        size = size if size in Gui.sizes or size == Gui.full_size else Gui.default_size
+        height, width = self._ruler_size(size, direction='vertical')
         self._set_geometry(width, height, x, y)
 
-        self._clear_canvas_figures()
-
-        for pos in range(0, height + 50, 10):
-            self._draw_mark(pos, direction='vertical')
+        self._show_tick_layer(height, size, direction='vertical')
 
-        self.external_position_marker.geometry('50x1+50+50')
+        self.external_marker.resize(50, 1)
 
     def move(self, x, y, speedup: int = 0):
-        geometry = self.root.geometry()
-        _x, _y = helpers.get_position(geometry)
-        width, height = helpers.get_size(geometry)
+        _x, _y = self.geometry.position
+        width, height = self.geometry.size
 
-        new_x = max(0, _x + x * speedup)
-        new_y = max(0, _y + y * speedup)
+        new_x = max(min(0, self.screen_size[0] - width), _x + x * speedup)
+        new_y = max(min(0, self.screen_size[1] - height), _y + y * speedup)
 
         self._set_geometry(width, height, new_x, new_y)
+        self._render_visible_ticks()
+
+
+Ruler = namedtuple('Ruler', ['id', 'statechart', 'gui'])
+
+
+class RulerGroup:
+    def __init__(self, make_gui: typing.Callable, schedule: typing.Callable, fps: float = 60, instrumented: bool = False, spy_size: int = 0, with_metrics: bool = False, on_empty: typing.Optional[typing.Callable] = None, call_soon: typing.Optional[typing.Callable] = None, on_phase: typing.Optional[typing.Callable] = None):
+        self.make_gui = make_gui
+        self.schedule = schedule
+        self.call_soon = call_soon
+        self.on_phase = on_phase
+        self.frame_pacer = FramePacer(fps=fps)
+        self.instrumented = instrumented
+        self.spy_size = spy_size
+        self.with_metrics = with_metrics
+        self.on_empty = on_empty
+
+        self.rulers = {}
+        self.next_id = 1
+        self.frame_scheduled = False
+
+    def add(self, orientation='horizontal', offset: typing.Tuple = (0, 0)) -> Ruler:
+        ruler_id = self.next_id
+        self.next_id += 1
+
+        bus = GlobalBus()
+        statechart = Statechart(f'ruler-{ruler_id}', bus=bus, instrumented=self.instrumented, spy_size=self.spy_size, synchronous=True, metrics=Metrics() if self.with_metrics else None, call_soon=self.call_soon)
+        gui = self.make_gui(bus, lambda _: self.remove(ruler_id))
+        gui.on_dirty = self.request_frame
+        self._phase('tk init')
+
+        statechart.start_at(init_state)
+        if orientation == 'vertical':
+            gui.send_event(signal=signals.TOGGLE_ORIENTATION)
+        if offset != (0, 0):
+            gui.send_event(signal=signals.MOVE, payload=MoveEventPayload(direction=offset, speedup=1))
+        self._phase('statechart')
+
+        self.rulers[ruler_id] = Ruler(id=ruler_id, statechart=statechart, gui=gui)
+        return self.rulers[ruler_id]
+
+    def _phase(self, phase: str):
+        if self.on_phase is not None:
+            self.on_phase(phase)
+
+    def get(self, ruler_id: typing.Optional[int] = None) -> typing.Optional[Ruler]:
+        if ruler_id is None:
+            return self.rulers[max(self.rulers)] if self.rulers else None
+        return self.rulers.get(ruler_id)
+
+    def remove(self, ruler_id: int):
+        ruler = self.rulers.pop(ruler_id, None)
+        if ruler is None:
+            return
+
+        ruler.statechart.stop()
+        ruler.gui.destroy()
+
+        if not self.rulers and self.on_empty is not None:
+            self.on_empty()
+
+    def metrics(self) -> typing.Dict:
+        return {ruler.id: ruler.statechart.metrics.summary() for ruler in self.rulers.values() if ruler.statechart.metrics is not None}
+
+    def start(self):
+        self.frame_scheduled = True
+        self._render_frame()
+
+    def request_frame(self):
+        if not self.frame_scheduled:
+            self.frame_scheduled = True
+            self.schedule(0, self._render_frame)
+
+    def _render_frame(self):
+        self.frame_pacer.begin(time.perf_counter())
+        flushed = sum(ruler.gui.flush() for ruler in list(self.rulers.values())) > 0
+        delay = self.frame_pacer.end(time.perf_counter(), flushed)
+
+        if flushed:
+            self.schedule(delay, self._render_frame)
+        else:
+            self.frame_pacer.stop()
+            self.frame_scheduled = False
 
 
 @spy_on
@@ -222,6 +938,12 @@ def init_state(c: Statechart, e: Event) -> return_status:
     elif e.signal == signals.MOVE:
         c.bus.gui.move(e.payload.direction[0], e.payload.direction[1], e.payload.speedup)
         status = return_status.HANDLED
+    elif e.signal == signals.CYCLE_UNIT:
+        c.bus.gui.cycle_unit()
+        status = return_status.HANDLED
+    elif e.signal == signals.TOGGLE_LOUPE:
+        c.bus.gui.toggle_loupe()
+        status = return_status.HANDLED
     elif e.signal == signals.SHUTDOWN:
         status = return_status.HANDLED
         c.bus.gui.quit()
@@ -254,9 +976,15 @@ def horizontal_state(c: Statechart, e: Event) -> return_status:
     elif e.signal == signals.SET_SIZE_3:
         c.bus.gui.make_horizontal(3)
         status = return_status.HANDLED
+    elif e.signal == signals.SET_SIZE_4:
+        c.bus.gui.make_horizontal(4)
+        status = return_status.HANDLED
     elif e.signal == signals.POINTER_MOVED:
         c.bus.gui.update_position_markers(e.payload[0])
         status = return_status.HANDLED
+    elif e.signal == signals.TOGGLE_SNAP:
+        c.bus.gui.toggle_snap()
+        status = return_status.HANDLED
     elif e.signal == signals.SHOW_EXTERNAL_MARKER:
         c.bus.gui.show_external_marker()
         status = return_status.HANDLED
@@ -290,9 +1018,15 @@ def vertical_state(c: Statechart, e: Event) -> return_status:
     elif e.signal == signals.SET_SIZE_3:
         c.bus.gui.make_vertical(3)
         status = return_status.HANDLED
+    elif e.signal == signals.SET_SIZE_4:
+        c.bus.gui.make_vertical(4)
+        status = return_status.HANDLED
     elif e.signal == signals.POINTER_MOVED:
         c.bus.gui.update_position_markers(e.payload[1], direction='vertical')
         status = return_status.HANDLED
+    elif e.signal == signals.TOGGLE_SNAP:
+        c.bus.gui.toggle_snap()
+        status = return_status.HANDLED
     elif e.signal == signals.SHOW_EXTERNAL_MARKER:
         c.bus.gui.show_external_marker()
         status = return_status.HANDLED
@@ -306,23 +1040,102 @@ def vertical_state(c: Statechart, e: Event) -> return_status:
     return status
 
 
-def run(args):
-    b = GlobalBus()
-    s = Statechart('statechart', bus=b)
-    g = Gui(bus=b, background=args.background, mark_color=args.mark_color, position_color=args.position_color)
+def gui_factory(args, root: tkinter.Misc, tick_images: TickImageCache, on_first_paint: typing.Optional[typing.Callable] = None, hidden: bool = False, schedule: typing.Optional[typing.Callable] = None) -> typing.Callable:
+    def make_gui(bus: GlobalBus, on_quit: typing.Callable) -> Gui:
+        g = Gui(bus=bus, background=args.background, mark_color=args.mark_color, position_color=args.position_color, pointer_interval=args.pointer_interval, length=args.length, tick_step=args.tick_step, acceleration=args.acceleration, fps=args.fps, on_first_paint=on_first_paint, master=root, tick_images=tick_images, on_quit=on_quit, unit=args.unit, dpi=args.dpi, zoom=args.zoom, schedule=schedule)
+        if hidden:
+            g.hide()
+        g.bind_events()
+        return g
+
+    return make_gui
 
-    s.start_at(init_state)
 
-    g.run()
+def run(args):
+    painted = False
+
+    def first_paint():
+        nonlocal painted
+        if painted:
+            return
+        painted = True
+
+        startup_profile.mark('first paint')
+        if args.profile_startup:
+            print(startup_profile.report(), file=sys.stderr)
+
+    root = tkinter.Tk()
+    root.withdraw()
+    if args.runtime == 'asyncio':
+        from screenuler.runtime import AsyncioRuntime
+        runtime = AsyncioRuntime(root)
+        make_gui = gui_factory(args, root, TickImageCache(root), on_first_paint=first_paint, schedule=runtime.schedule)
+        group = RulerGroup(make_gui=make_gui, schedule=runtime.schedule, fps=args.fps, instrumented=args.instrumented, spy_size=args.spy_size, with_metrics=not args.no_metrics, on_empty=runtime.quit, call_soon=runtime.call_soon, on_phase=startup_profile.mark)
+        mainloop = runtime.run
+    else:
+        runtime = None
+        make_gui = gui_factory(args, root, TickImageCache(root), on_first_paint=first_paint)
+        group = RulerGroup(make_gui=make_gui, schedule=root.after, fps=args.fps, instrumented=args.instrumented, spy_size=args.spy_size, with_metrics=not args.no_metrics, on_empty=root.quit, on_phase=startup_profile.mark)
+        mainloop = root.mainloop
+    metrics.dump_on_signal(lambda: metrics.dump(group.metrics()))
+
+    # every ruler marks 'tk init' once its window is built and 'statechart' once it is started
+    for i, orientation in enumerate(args.rulers):
+        group.add(orientation, offset=(i * 100, i * 100))
+
+    recorder = None
+    if args.record:
+        recorder = Recorder(open(args.record, 'wb'))
+        group.get(1).gui.recorder = recorder
+
+    group.start()
+    try:
+        mainloop()
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if runtime is not None:
+            runtime.close()
+
+    if args.frame_stats:
+        print(' '.join(f'{k}={v:.2f}' if isinstance(v, float) else f'{k}={v}' for k, v in group.frame_pacer.summary().items()), file=sys.stderr)
 
 def make_arguments_and_run():
     parser = argparse.ArgumentParser(prog='screenuler', description='Simple Python Tkinter screen ruler')
     parser.add_argument('-b', '--background', type=str, default='red', help='color name (red) or hexcode (#f00)')
     parser.add_argument('-m', '--mark_color', type=str, default='black', help='color name (red) or hexcode (#f00)')
     parser.add_argument('-p', '--position_color', type=str, default='white', help='color name (red) or hexcode (#f00)')
+    parser.add_argument('-l', '--length', type=int, default=0, help='length of the full size ruler (CTRL-F), defaults to the screen length')
+    parser.add_argument('-t', '--tick_step', type=int, default=10, choices=[1, 2, 5, 10, 25, 50], help='pixels between tick marks')
+    parser.add_argument('-u', '--unit', type=str, default='px', choices=units, help='ruler unit, CTRL-U cycles through them')
+    parser.add_argument('--dpi', type=float, default=0, help='screen dots per inch for physical units, defaults to what Tk reports')
+    parser.add_argument('-z', '--zoom', type=float, default=1.0, help='scale factor between content and screen, e.g. 2 for a 200%% zoomed page')
+    parser.add_argument('--fps', type=helpers.positive_float, default=60, help='maximum redraws per second')
+    parser.add_argument('--frame_stats', action='store_true', help='print frame times and dropped frames on exit')
+    parser.add_argument('--profile_startup', action='store_true', help='print time spent in imports, Tk init, statechart start and first paint')
+    parser.add_argument('--instrumented', action='store_true', help='record statechart spy and trace logs')
+    parser.add_argument('--spy_size', type=int, default=500, help='number of spy and trace lines kept while instrumented')
+    parser.add_argument('--no_metrics', action='store_true', help='disable per-signal counts and latency histograms (CTRL-D or SIGUSR1 dumps them, CTRL-O shows them)')
+    parser.add_argument('-a', '--acceleration', type=float, default=20.0, help='extra move steps per second an arrow key is held, 0 disables acceleration')
+    parser.add_argument('-i', '--pointer_interval', type=int, default=16, help='milliseconds between pointer updates, 0 disables coalescing')
+    parser.add_argument('-r', '--rulers', nargs='+', default=['horizontal'], choices=['horizontal', 'vertical'], metavar='ORIENTATION', help='open one ruler per orientation given, all sharing one window system connection')
+    parser.add_argument('--runtime', type=str, default='tk', choices=['tk', 'asyncio'], help='tk runs the Tk mainloop, asyncio pumps Tk from an asyncio loop that also dispatches the statecharts and frame timers')
+    parser.add_argument('--daemon', action='store_true', help='stay resident with a hidden ruler controlled by screenuler-client')
+    parser.add_argument('--socket', type=str, default=None, help='daemon socket path')
+    parser.add_argument('--record', type=str, default=None, help='write the input of the first ruler to a binary log for benchmarks.harness --replay')
     args = parser.parse_args()
+    startup_profile.mark('arguments')
+
+    if args.daemon and args.record is not None:
+        parser.error('--record records a ruler session and is not supported with --daemon')
+    if args.daemon and args.runtime != 'tk':
+        parser.error('--daemon runs on the Tk mainloop, --runtime asyncio is not supported with it')
 
-    run(args)
+    if args.daemon:
+        from screenuler.daemon import run_daemon
+        run_daemon(args)
+    else:
+        run(args)
 
 if __name__ == '__main__':
     make_arguments_and_run()
\ No newline at end of file
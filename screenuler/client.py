@@ -0,0 +1,62 @@
+import argparse
+import json
+import socket
+import sys
+import typing
+
+import screenuler.helpers as helpers
+
+
+def send(request: typing.Dict, path: typing.Optional[str] = None, timeout: float = 2.0) -> typing.Dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(path or helpers.socket_path())
+        connection.sendall((json.dumps(request) + '\n').encode())
+        with connection.makefile('r') as f:
+            return json.loads(f.readline())
+
+
+def make_arguments_and_send():
+    parser = argparse.ArgumentParser(prog='screenuler-client', description='Control a resident screenuler daemon (screenuler --daemon)')
+    parser.add_argument('command', choices=['open', 'close', 'move', 'configure', 'list', 'metrics', 'ping', 'quit'])
+    parser.add_argument('--id', type=int, default=None, help='ruler to control, defaults to the last opened one, open without --id reuses a hidden ruler or creates a new one')
+    parser.add_argument('-o', '--orientation', choices=['horizontal', 'vertical'])
+    parser.add_argument('-s', '--size', type=int, choices=[1, 2, 3, 4])
+    parser.add_argument('-x', type=int, help='absolute x position')
+    parser.add_argument('-y', type=int, help='absolute y position')
+    parser.add_argument('--dx', type=int, default=0, help='relative x movement')
+    parser.add_argument('--dy', type=int, default=0, help='relative y movement')
+    parser.add_argument('--socket', type=str, default=None, help=f'daemon socket, defaults to {helpers.socket_path()}')
+    args = parser.parse_args()
+
+    request_args = {}
+    if args.command in ('open', 'configure'):
+        request_args.update(orientation=args.orientation, size=args.size)
+    if args.command == 'open':
+        request_args.update(x=args.x, y=args.y)
+    if args.command == 'move':
+        request_args.update(x=args.x, y=args.y, dx=args.dx, dy=args.dy)
+
+    request = {'command': args.command, 'args': request_args}
+    if args.id is not None:
+        request['id'] = args.id
+
+    try:
+        response = send(request, path=args.socket)
+    except (ConnectionRefusedError, FileNotFoundError):
+        sys.exit('screenuler daemon is not running, start it with: screenuler --daemon')
+
+    if not response.get('ok'):
+        sys.exit(response.get('error', 'request failed'))
+
+    if args.command == 'open':
+        print(response['id'])
+    elif args.command == 'list':
+        for ruler in response['rulers']:
+            print(ruler['id'], ruler['orientation'], 'visible' if ruler['visible'] else 'hidden')
+    elif args.command == 'metrics':
+        print(json.dumps(response['metrics'], indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    make_arguments_and_send()
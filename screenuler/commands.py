@@ -0,0 +1,96 @@
+import threading
+import typing
+
+
+class GuiCommandQueue:
+    order = ('ticks', 'unit', 'geometry', 'snap', 'marker', 'external_marker', 'loupe', 'quit')
+
+    def __init__(self, gui, on_dirty: typing.Optional[typing.Callable] = None):
+        self.gui = gui
+        self.on_dirty = on_dirty
+        self.lock = threading.Lock()
+        self.pending = {}
+
+        self.enqueued = 0
+        self.executed = 0
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def _wake(self, woke: bool):
+        if woke and self.on_dirty is not None:
+            self.on_dirty()
+
+    def _put(self, slot: str, command: typing.Tuple):
+        with self.lock:
+            self.enqueued += 1
+            woke = not self.pending
+            self.pending[slot] = command
+        self._wake(woke)
+
+    def make_horizontal(self, size: int = 1):
+        with self.lock:
+            self.pending.pop('marker', None)
+        self._put('ticks', ('make_horizontal', size))
+
+    def make_vertical(self, size: int = 1):
+        with self.lock:
+            self.pending.pop('marker', None)
+        self._put('ticks', ('make_vertical', size))
+
+    def move(self, x, y, speedup: int = 0):
+        with self.lock:
+            self.enqueued += 1
+            woke = not self.pending
+            _, dx, dy, _ = self.pending.get('geometry', ('move', 0, 0, 1))
+            self.pending['geometry'] = ('move', dx + x * speedup, dy + y * speedup, 1)
+        self._wake(woke)
+
+    def cycle_unit(self, steps: int = 1):
+        with self.lock:
+            self.enqueued += 1
+            woke = not self.pending
+            _, pending = self.pending.get('unit', ('cycle_unit', 0))
+            self.pending['unit'] = ('cycle_unit', pending + steps)
+        self._wake(woke)
+
+    def toggle_loupe(self):
+        with self.lock:
+            self.enqueued += 1
+            woke = not self.pending
+            _, pending = self.pending.get('loupe', ('toggle_loupe', 0))
+            self.pending['loupe'] = ('toggle_loupe', pending + 1)
+        self._wake(woke)
+
+    def toggle_snap(self):
+        with self.lock:
+            self.enqueued += 1
+            woke = not self.pending
+            _, pending = self.pending.get('snap', ('toggle_snap', 0))
+            self.pending['snap'] = ('toggle_snap', pending + 1)
+        self._wake(woke)
+
+    def update_position_markers(self, pos, direction='horizontal'):
+        self._put('marker', ('update_position_markers', pos, direction))
+
+    def show_external_marker(self):
+        self._put('external_marker', ('show_external_marker',))
+
+    def hide_external_marker(self):
+        self._put('external_marker', ('hide_external_marker',))
+
+    def quit(self):
+        self._put('quit', ('quit',))
+
+    def drain(self) -> int:
+        with self.lock:
+            pending, self.pending = self.pending, {}
+
+        for slot in self.order:
+            if slot in pending:
+                name, *args = pending[slot]
+                getattr(self.gui, name)(*args)
+
+        self.executed += len(pending)
+
+        return len(pending)
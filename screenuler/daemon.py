@@ -0,0 +1,252 @@
+import json
+import os
+import socket
+import sys
+import tkinter
+import typing
+
+from miros import signals
+
+import screenuler.helpers as helpers
+import screenuler.metrics as metrics
+from screenuler.app import Gui
+from screenuler.app import MoveEventPayload
+from screenuler.app import RulerGroup
+from screenuler.app import Statechart
+from screenuler.app import TickImageCache
+from screenuler.app import gui_factory
+from screenuler.app import vertical_state
+
+
+class RulerService:
+    def __init__(self, statechart: Statechart, gui):
+        self.statechart = statechart
+        self.gui = gui
+
+    def handle(self, request: typing.Dict) -> typing.Dict:
+        command = request.get('command')
+        handler = getattr(self, f'do_{command}', None)
+        if handler is None:
+            return {'ok': False, 'error': f'unknown command: {command}'}
+
+        try:
+            handler(**request.get('args', {}))
+        except (TypeError, ValueError) as e:
+            return {'ok': False, 'error': str(e)}
+
+        return {'ok': True, 'orientation': self.orientation()}
+
+    def orientation(self) -> str:
+        return 'vertical' if self.statechart.state.fun is vertical_state else 'horizontal'
+
+    def do_ping(self):
+        pass
+
+    def do_open(self, orientation: typing.Optional[str] = None, size: typing.Optional[int] = None, x: typing.Optional[int] = None, y: typing.Optional[int] = None):
+        self.do_configure(orientation=orientation, size=size)
+        self.do_move(x=x, y=y)
+        self.gui.show()
+
+    def do_close(self):
+        self.gui.hide()
+
+    def do_configure(self, orientation: typing.Optional[str] = None, size: typing.Optional[int] = None):
+        if orientation not in (None, 'horizontal', 'vertical'):
+            raise ValueError(f'unknown orientation: {orientation}')
+        if size is not None and size not in (*Gui.sizes, Gui.full_size):
+            raise ValueError(f'unknown size: {size}')
+
+        if orientation is not None and orientation != self.orientation():
+            self.gui.send_event(signal=signals.TOGGLE_ORIENTATION)
+        if size is not None:
+            self.gui.send_event(signal=getattr(signals, f'SET_SIZE_{size}'))
+
+    def do_move(self, x: typing.Optional[int] = None, y: typing.Optional[int] = None, dx: int = 0, dy: int = 0):
+        if x is not None or y is not None:
+            # apply moves still queued for the next frame so the delta starts from where they leave the ruler
+            self.gui.flush()
+
+        if x is not None:
+            dx += x - self.gui.geometry.x
+        if y is not None:
+            dy += y - self.gui.geometry.y
+
+        if dx or dy:
+            self.gui.send_event(signal=signals.MOVE, payload=MoveEventPayload(direction=(dx, dy), speedup=1))
+
+
+class DaemonService:
+    def __init__(self, group: RulerGroup, quit: typing.Callable):
+        self.group = group
+        self.quit = quit
+        self.visible = set()
+        self.current = None
+
+    def handle(self, request: typing.Dict) -> typing.Dict:
+        command = request.get('command')
+        self.visible &= self.group.rulers.keys()
+
+        if command == 'list':
+            return {'ok': True, 'rulers': [self._describe(ruler) for ruler in self.group.rulers.values()]}
+        if command == 'metrics':
+            return {'ok': True, 'metrics': self.group.metrics()}
+        if command == 'quit':
+            self.quit()
+            return {'ok': True}
+
+        ruler_id = request.get('id')
+        if command == 'open' and ruler_id is None:
+            ruler = self._reusable() or self.group.add()
+        elif ruler_id is not None:
+            ruler = self.group.get(ruler_id)
+        else:
+            ruler = self.group.rulers.get(self.current) or self.group.get()
+        if ruler is None:
+            return {'ok': False, 'error': f'unknown ruler: {ruler_id}'}
+
+        response = RulerService(statechart=ruler.statechart, gui=ruler.gui).handle(request)
+        if response['ok']:
+            if command == 'open':
+                self.visible.add(ruler.id)
+                self.current = ruler.id
+            elif command == 'close':
+                self.visible.discard(ruler.id)
+        response['id'] = ruler.id
+
+        return response
+
+    def _reusable(self):
+        hidden = sorted(self.group.rulers.keys() - self.visible)
+        return self.group.rulers[hidden[0]] if hidden else None
+
+    def _describe(self, ruler) -> typing.Dict:
+        orientation = RulerService(statechart=ruler.statechart, gui=ruler.gui).orientation()
+        return {'id': ruler.id, 'orientation': orientation, 'visible': ruler.id in self.visible}
+
+
+class Daemon:
+    max_request = 64 * 1024
+
+    def __init__(self, root: tkinter.Misc, service: DaemonService, path: str, request_timeout: int = 1000):
+        self.root = root
+        self.service = service
+        self.path = path
+        self.request_timeout = request_timeout
+
+        if os.path.exists(path):
+            self._remove_stale_socket(path)
+
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen()
+        self.server.setblocking(False)
+        self.inode = os.stat(path).st_ino
+
+        self.buffers = {}
+
+        self.root.tk.createfilehandler(self.server, tkinter.READABLE, self._on_readable)
+
+    @staticmethod
+    def _remove_stale_socket(path: str):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                pass
+            else:
+                raise RuntimeError(f'a screenuler daemon is already listening on {path}')
+
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def _on_readable(self, *_):
+        try:
+            connection, _ = self.server.accept()
+        except BlockingIOError:
+            return
+
+        connection.setblocking(False)
+        self.buffers[connection] = bytearray()
+        self.root.tk.createfilehandler(connection, tkinter.READABLE, lambda *_: self._on_request_data(connection))
+        # a client that never finishes its line is dropped instead of holding a file handler forever
+        self.root.after(self.request_timeout, lambda: self._finish(connection, {'ok': False, 'error': 'request timed out'}))
+
+    def _on_request_data(self, connection: socket.socket):
+        buffer = self.buffers.get(connection)
+        if buffer is None:
+            return
+
+        try:
+            chunk = connection.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._finish(connection, {'ok': False, 'error': str(e)})
+            return
+
+        buffer += chunk
+        if b'\n' not in buffer and chunk and len(buffer) <= Daemon.max_request:
+            return
+
+        try:
+            request = json.loads(buffer.split(b'\n', 1)[0])
+        except ValueError as e:
+            response = {'ok': False, 'error': str(e)}
+        else:
+            if isinstance(request, dict):
+                response = self.service.handle(request)
+            else:
+                response = {'ok': False, 'error': 'request must be a JSON object'}
+
+        self._finish(connection, response)
+
+    def _finish(self, connection: socket.socket, response: typing.Dict):
+        if self.buffers.pop(connection, None) is None:
+            return
+
+        self.root.tk.deletefilehandler(connection)
+        with connection:
+            # responses can outgrow the socket buffer, a non-blocking sendall would cut them off
+            connection.settimeout(self.request_timeout / 1000)
+            try:
+                connection.sendall((json.dumps(response) + '\n').encode())
+            except OSError:
+                pass
+
+    def close(self):
+        if self.server.fileno() == -1:
+            return
+
+        for connection in list(self.buffers):
+            self._finish(connection, {'ok': False, 'error': 'daemon stopped'})
+
+        self.root.tk.deletefilehandler(self.server)
+        self.server.close()
+
+        # another daemon may have replaced a socket file this one was told to give up
+        try:
+            if os.stat(self.path).st_ino == self.inode:
+                os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def run_daemon(args):
+    root = tkinter.Tk()
+    root.withdraw()
+    group = RulerGroup(make_gui=gui_factory(args, root, TickImageCache(root), hidden=True), schedule=root.after, fps=args.fps, instrumented=args.instrumented, spy_size=args.spy_size, with_metrics=not args.no_metrics)
+    metrics.dump_on_signal(lambda: metrics.dump(group.metrics()))
+    group.add()
+
+    try:
+        daemon = Daemon(root=root, service=DaemonService(group=group, quit=root.quit), path=args.socket or helpers.socket_path())
+    except RuntimeError as e:
+        root.destroy()
+        sys.exit(str(e))
+    try:
+        group.start()
+        root.mainloop()
+    finally:
+        daemon.close()
@@ -0,0 +1,71 @@
+import functools
+import operator
+import typing
+from array import array
+from bisect import bisect_left
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    # numpy takes longer to import than the rest of the ruler, so it is only loaded once snapping scans a strip
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def find_edges(pixels: bytes, threshold: int = 60) -> array:
+    numpy = _numpy()
+    if numpy is not None:
+        luminance = numpy.frombuffer(pixels, dtype=numpy.uint8).reshape(-1, 3).sum(axis=1, dtype=numpy.int32)
+        gradient = numpy.abs(numpy.diff(luminance))
+        padded = numpy.concatenate(([0], gradient, [0]))
+        peaks = (gradient >= threshold) & (gradient >= padded[:-2]) & (gradient > padded[2:])
+        return array('i', (numpy.flatnonzero(peaks) + 1).tolist())
+
+    luminance = list(map(operator.add, map(operator.add, pixels[0::3], pixels[1::3]), pixels[2::3]))
+    gradient = list(map(abs, map(operator.sub, luminance[1:], luminance[:-1])))
+    padded = [0, *gradient, 0]
+
+    return array('i', [i + 1 for i, (before, g, after) in enumerate(zip(padded, gradient, padded[2:])) if g >= threshold and g >= before and g > after])
+
+
+def nearest_edge(edges: array, pos: int, radius: int) -> int:
+    i = bisect_left(edges, pos)
+    candidates = [edges[j] for j in (i - 1, i) if 0 <= j < len(edges)]
+    if not candidates:
+        return pos
+
+    edge = min(candidates, key=lambda candidate: abs(candidate - pos))
+    return edge if abs(edge - pos) <= radius else pos
+
+
+class EdgeIndex:
+    def __init__(self, capture: typing.Callable, threshold: int = 60, radius: int = 8):
+        self.capture = capture
+        self.threshold = threshold
+        self.radius = radius
+
+        self.strip = None
+        self.edges = array('i')
+
+        self.lookups = 0
+        self.scans = 0
+
+    def invalidate(self):
+        self.strip = None
+
+    def snap(self, pos: int, strip: typing.Tuple) -> int:
+        self.lookups += 1
+
+        if strip != self.strip:
+            pixels = self.capture(*strip)
+            self.edges = array('i') if pixels is None else find_edges(pixels, self.threshold)
+            self.strip = strip
+            self.scans += 1
+
+        return nearest_edge(self.edges, pos, self.radius)
+
+    def stats(self) -> typing.Dict:
+        return {'lookups': self.lookups, 'scans': self.scans}
@@ -0,0 +1,58 @@
+import typing
+from collections import deque
+
+
+class FramePacer:
+    def __init__(self, fps: float = 60, history: int = 600):
+        if fps <= 0:
+            raise ValueError(f'fps must be positive, got {fps}')
+
+        self.interval = 1 / fps
+        self.deadline = None
+        self.started = None
+
+        self.durations = deque(maxlen=history)
+        self.frames = 0
+        self.flushed = 0
+        self.dropped = 0
+
+    def begin(self, now: float):
+        if self.deadline is None:
+            self.deadline = now
+
+        late = now - self.deadline
+        if late >= self.interval:
+            missed = int(late // self.interval)
+            self.dropped += missed
+            self.deadline += missed * self.interval
+
+        self.started = now
+        self.frames += 1
+
+    def end(self, now: float, flushed: bool) -> int:
+        if flushed:
+            self.flushed += 1
+            self.durations.append(now - self.started)
+
+        self.deadline += self.interval
+
+        return max(0, round((self.deadline - now) * 1000))
+
+    def stop(self):
+        # the next begin() starts a fresh deadline instead of counting the idle gap as dropped frames
+        self.deadline = None
+
+    def summary(self) -> typing.Dict:
+        durations = sorted(self.durations)
+
+        def percentile(p):
+            return durations[min(len(durations) - 1, int(len(durations) * p))] * 1000 if durations else 0.0
+
+        return {
+            'frames': self.frames,
+            'flushed': self.flushed,
+            'dropped': self.dropped,
+            'p50_ms': percentile(0.50),
+            'p99_ms': percentile(0.99),
+            'max_ms': durations[-1] * 1000 if durations else 0.0
+        }
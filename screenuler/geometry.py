@@ -0,0 +1,64 @@
+import time
+import typing
+from collections import deque
+
+import screenuler.helpers as helpers
+
+
+class WindowGeometry:
+    def __init__(self, width: int = 0, height: int = 0, x: int = 0, y: int = 0, clock: typing.Callable = time.monotonic, expiry: float = 1.0):
+        self.width = width
+        self.height = height
+        self.x = x
+        self.y = y
+
+        self.clock = clock
+        self.expiry = expiry
+        # (geometry, requested at) still waiting for their <Configure>, oldest first
+        self.requested = deque()
+
+    @classmethod
+    def from_string(cls, geometry: str) -> 'WindowGeometry':
+        width, height = helpers.get_size(geometry)
+        x, y = helpers.get_position(geometry)
+
+        return cls(width, height, x, y)
+
+    @property
+    def position(self) -> typing.Tuple:
+        return self.x, self.y
+
+    @property
+    def size(self) -> typing.Tuple:
+        return self.width, self.height
+
+    def request(self, width: int, height: int, x: int, y: int) -> str:
+        now = self.clock()
+        self._expire(now)
+        self.width, self.height, self.x, self.y = width, height, x, y
+        self.requested.append(((width, height, x, y), now))
+
+        return str(self)
+
+    def _expire(self, now: float):
+        # a request whose <Configure> never came (withdrawn window, merged by the window manager) is dropped
+        while self.requested and now - self.requested[0][1] > self.expiry:
+            self.requested.popleft()
+
+    def configure(self, width: int, height: int, x: int, y: int) -> bool:
+        reported = (width, height, x, y)
+        self._expire(self.clock())
+
+        if any(geometry == reported for geometry, _ in self.requested):
+            while self.requested.popleft()[0] != reported:
+                pass
+            return False
+
+        self.requested.clear()
+        changed = reported != (self.width, self.height, self.x, self.y)
+        self.width, self.height, self.x, self.y = reported
+
+        return changed
+
+    def __str__(self) -> str:
+        return f'{self.width}x{self.height}+{self.x}+{self.y}'
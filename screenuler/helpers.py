@@ -1,3 +1,6 @@
+import argparse
+import os
+import tempfile
 import typing
 
 
@@ -27,3 +30,21 @@ def is_speedup_modifier_active(state) -> int:
         result = 25
 
     return result
+
+
+def socket_path() -> str:
+    directory = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+
+    return os.path.join(directory, f'screenuler-{os.getuid()}.sock')
+
+
+def positive_float(value: str) -> float:
+    try:
+        result = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'{value!r} is not a number')
+
+    if not result > 0:
+        raise argparse.ArgumentTypeError(f'{value!r} must be greater than 0')
+
+    return result
@@ -0,0 +1,101 @@
+import typing
+
+
+class PointerCoalescer:
+    def __init__(self, emit: typing.Callable, schedule: typing.Callable, interval: int = 16):
+        self.emit = emit
+        self.schedule = schedule
+        self.interval = interval
+
+        self.pending = None
+        self.scheduled = False
+
+        self.received = 0
+        self.emitted = 0
+
+    @property
+    def merged(self) -> int:
+        return self.received - self.emitted - (0 if self.pending is None else 1)
+
+    def push(self, pos: typing.Tuple):
+        self.received += 1
+        self.pending = pos
+
+        if self.interval <= 0:
+            self.flush()
+        elif not self.scheduled:
+            self.scheduled = True
+            self.schedule(self.interval, self.flush)
+
+    def flush(self):
+        self.scheduled = False
+
+        if self.pending is None:
+            return
+
+        pos, self.pending = self.pending, None
+        self.emitted += 1
+        self.emit(pos)
+
+    def stats(self) -> typing.Dict:
+        return {'received': self.received, 'emitted': self.emitted, 'merged': self.merged}
+
+
+class MoveAccumulator:
+    def __init__(self, emit: typing.Callable, schedule: typing.Callable, interval: int = 16, acceleration: float = 20.0, max_multiplier: float = 64.0, repeat_gap: float = 0.05):
+        self.emit = emit
+        self.schedule = schedule
+        self.interval = interval
+        self.acceleration = acceleration
+        self.max_multiplier = max_multiplier
+        self.repeat_gap = repeat_gap
+
+        self.dx = 0
+        self.dy = 0
+        self.scheduled = False
+
+        self.held_direction = None
+        self.held_since = 0.0
+        self.released_at = None
+
+        self.received = 0
+        self.emitted = 0
+
+    def multiplier(self, now: float) -> float:
+        return min(self.max_multiplier, 1 + (now - self.held_since) * self.acceleration)
+
+    def press(self, direction: typing.Tuple, speedup: int, now: float):
+        repeating = direction == self.held_direction and (self.released_at is None or now - self.released_at <= self.repeat_gap)
+        if not repeating:
+            self.held_direction = direction
+            self.held_since = now
+        self.released_at = None
+
+        self.received += 1
+        step = round(speedup * self.multiplier(now))
+        self.dx += direction[0] * step
+        self.dy += direction[1] * step
+
+        if self.interval <= 0:
+            self.flush()
+        elif not self.scheduled:
+            self.scheduled = True
+            self.schedule(self.interval, self.flush)
+
+    def release(self, direction: typing.Tuple, now: float):
+        if direction == self.held_direction:
+            self.released_at = now
+
+    def flush(self):
+        self.scheduled = False
+
+        if self.dx == 0 and self.dy == 0:
+            return
+
+        delta = (self.dx, self.dy)
+        self.dx = self.dy = 0
+        self.emitted += 1
+        self.emit(delta)
+
+    def stats(self) -> typing.Dict:
+        return {'received': self.received, 'emitted': self.emitted}
@@ -0,0 +1,88 @@
+import functools
+import typing
+from array import array
+from bisect import bisect_left
+from bisect import bisect_right
+
+units_per_inch = {
+    'in': 1,
+    'mm': 25.4,
+    'pt': 72,
+    'em': 6
+}
+
+# minor tick step in units, minor ticks per mid tick (0 for none), minor ticks per labelled tick
+schemes = {
+    'mm': (1, 5, 10),
+    'in': (0.125, 4, 8),
+    'pt': (6, 6, 12),
+    'em': (0.5, 2, 10)
+}
+
+units = ('px', *units_per_inch)
+
+minor_length = 10
+mid_length = 17
+major_length = 25
+
+px_label_step = 50
+
+
+class TickLayout:
+    def __init__(self, positions: array, lengths: array, label_positions: array, labels: typing.Tuple, key: typing.Tuple = ()):
+        self.positions = positions
+        self.lengths = lengths
+        self.label_positions = label_positions
+        self.labels = labels
+        # the arguments the layout was computed from, equal layouts share it even after the lru cache rebuilt them
+        self.key = key
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def tick_range(self, start: int, end: int) -> range:
+        return range(bisect_left(self.positions, start), bisect_right(self.positions, end))
+
+    def label_range(self, start: int, end: int) -> range:
+        return range(bisect_left(self.label_positions, start), bisect_right(self.label_positions, end))
+
+
+def pixels_per_unit(unit: str, dpi: float = 96.0, zoom: float = 1.0) -> float:
+    if unit == 'px':
+        return zoom
+    if unit not in units_per_inch:
+        raise ValueError(f'unknown unit: {unit}')
+    return dpi / units_per_inch[unit] * zoom
+
+
+def format_position(pos: int, unit: str = 'px', dpi: float = 96.0, zoom: float = 1.0) -> str:
+    if unit == 'px' and zoom == 1.0:
+        return str(pos)
+    return f'{pos / pixels_per_unit(unit, dpi, zoom):.1f}'
+
+
+@functools.lru_cache(maxsize=64)
+def tick_layout(length: int, unit: str = 'px', dpi: float = 96.0, zoom: float = 1.0, step: int = 10) -> TickLayout:
+    scale = pixels_per_unit(unit, dpi, zoom)
+
+    if unit == 'px':
+        minor, mid, major = step, 0, max(1, px_label_step // step)
+    else:
+        minor, mid, major = schemes[unit]
+
+    count = int(length / (minor * scale)) + 1
+    indexes = range(count)
+    positions = array('i', [round(i * minor * scale) for i in indexes])
+
+    if unit == 'px':
+        lengths = array('B', [major_length]) * count
+    else:
+        lengths = array('B', [major_length if i % major == 0 else mid_length if mid and i % mid == 0 else minor_length for i in indexes])
+
+    return TickLayout(
+        positions=positions,
+        lengths=lengths,
+        label_positions=positions[::major],
+        labels=tuple(unit if i == 0 and unit != 'px' else f'{i * minor:g}' for i in indexes[::major]),
+        key=(length, unit, dpi, zoom, step)
+    )
@@ -0,0 +1,75 @@
+import functools
+import typing
+
+
+@functools.lru_cache(maxsize=None)
+def _image_grab():
+    # Pillow is only loaded once the loupe or snapping is turned on, it is not needed to start a ruler
+    try:
+        from PIL import ImageGrab
+    except ImportError:
+        return None
+    return ImageGrab
+
+
+def available() -> bool:
+    return _image_grab() is not None
+
+
+def grab_screen(left: int, top: int, width: int, height: int) -> typing.Optional[bytes]:
+    try:
+        image = _image_grab().grab(bbox=(left, top, left + width, top + height))
+    except OSError:
+        return None
+
+    if image.size != (width, height):
+        return None
+
+    return image.convert('RGB').tobytes()
+
+
+class Loupe:
+    def __init__(self, capture: typing.Callable, radius: int = 7, factor: int = 8):
+        self.capture = capture
+        self.radius = radius
+        self.factor = factor
+
+        self.source_size = 2 * radius + 1
+        self.size = self.source_size * factor
+
+        # one unscaled ppm image, every capture is written behind the fixed header and Tk zooms it natively
+        self.source_header = f'P6 {self.source_size} {self.source_size} 255\n'.encode()
+        self.offset = len(self.source_header)
+        self.frame = bytearray(self.source_header) + bytearray(self.source_size * self.source_size * 3)
+        self.pixels = memoryview(self.frame)[self.offset:]
+
+        self.center = None
+
+        self.requested = 0
+        self.captured = 0
+
+    def update(self, x: int, y: int) -> bool:
+        self.requested += 1
+
+        if (x, y) == self.center:
+            return False
+
+        pixels = self.capture(x - self.radius, y - self.radius, self.source_size, self.source_size)
+        if pixels is None:
+            return False
+
+        self.center = (x, y)
+        self.pixels[:] = pixels
+        self.captured += 1
+
+        return True
+
+    def source_ppm(self) -> bytes:
+        # _tkinter passes only bytes through as image data, a bytearray or memoryview arrives as its repr
+        return bytes(self.frame)
+
+    def reset(self):
+        self.center = None
+
+    def stats(self) -> typing.Dict:
+        return {'requested': self.requested, 'captured': self.captured}
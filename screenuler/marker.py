@@ -0,0 +1,83 @@
+import time
+import typing
+
+
+class ExternalMarkerUpdater:
+    def __init__(self, apply_geometry: typing.Callable, apply_visible: typing.Callable, schedule: typing.Callable, min_interval: float = 1 / 30, debounce: float = 0.05, clock: typing.Callable = time.monotonic):
+        self.apply_geometry = apply_geometry
+        self.apply_visible = apply_visible
+        self.schedule = schedule
+        self.min_interval = min_interval
+        self.debounce = debounce
+        self.clock = clock
+
+        self.size = (0, 0)
+        self.position = (0, 0)
+        self.applied_geometry = None
+        self.applied_at = None
+        self.geometry_scheduled = False
+
+        self.visible = None
+        self.applied_visible = None
+        self.visibility_scheduled = False
+
+        self.requested = 0
+        self.applied = 0
+        self.skipped = 0
+
+    def _geometry(self) -> str:
+        return f'{self.size[0]}x{self.size[1]}+{self.position[0]}+{self.position[1]}'
+
+    def _request_geometry(self):
+        self.requested += 1
+
+        if self._geometry() == self.applied_geometry:
+            self.skipped += 1
+            return
+
+        if self.geometry_scheduled:
+            return
+
+        wait = 0.0 if self.applied_at is None else self.applied_at + self.min_interval - self.clock()
+        if wait <= 0:
+            self.flush_geometry()
+        else:
+            self.geometry_scheduled = True
+            self.schedule(max(1, round(wait * 1000)), self.flush_geometry)
+
+    def flush_geometry(self):
+        self.geometry_scheduled = False
+
+        geometry = self._geometry()
+        if geometry == self.applied_geometry:
+            return
+
+        self.apply_geometry(geometry)
+        self.applied_geometry = geometry
+        self.applied_at = self.clock()
+        self.applied += 1
+
+    def move_to(self, x: int, y: int):
+        self.position = (x, y)
+        self._request_geometry()
+
+    def resize(self, width: int, height: int):
+        self.size = (width, height)
+        self._request_geometry()
+
+    def set_visible(self, visible: bool):
+        self.visible = visible
+
+        if not self.visibility_scheduled:
+            self.visibility_scheduled = True
+            self.schedule(max(1, round(self.debounce * 1000)), self.flush_visibility)
+
+    def flush_visibility(self):
+        self.visibility_scheduled = False
+
+        if self.visible != self.applied_visible:
+            self.apply_visible(self.visible)
+            self.applied_visible = self.visible
+
+    def stats(self) -> typing.Dict:
+        return {'requested': self.requested, 'applied': self.applied, 'skipped': self.skipped}
@@ -0,0 +1,120 @@
+import json
+import signal
+import sys
+import time
+import typing
+
+
+class Histogram:
+    bucket_count = 32
+
+    def __init__(self):
+        self.buckets = [0] * Histogram.bucket_count
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int):
+        self.buckets[min(value.bit_length(), Histogram.bucket_count - 1)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> int:
+        rank = self.count * p
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank and bucket < Histogram.bucket_count - 1:
+                return min(self.max, (1 << bucket) - 1)
+        return self.max
+
+    def summary(self) -> typing.Dict:
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(0.50),
+            'p99': self.percentile(0.99),
+            'max': self.max
+        }
+
+
+class Metrics:
+    def __init__(self, clock: typing.Callable = time.perf_counter):
+        self.clock = clock
+
+        self.signals = {}
+        self.queue_depth = Histogram()
+        self.input_to_dispatch = {}
+        self.dispatch = {}
+        self.latency = Histogram()
+        self.dispatch_to_render = Histogram()
+
+        self.render_pending_since = None
+
+    def posted(self, e):
+        e.posted_at = self.clock()
+
+    def dispatching(self, e, queue_depth: int) -> float:
+        now = self.clock()
+
+        name = e.signal_name
+        self.signals[name] = self.signals.get(name, 0) + 1
+        self.queue_depth.record(queue_depth)
+
+        posted_at = getattr(e, 'posted_at', None)
+        if posted_at is not None:
+            latency = int((now - posted_at) * 1_000_000)
+            if name not in self.input_to_dispatch:
+                self.input_to_dispatch[name] = Histogram()
+            self.input_to_dispatch[name].record(latency)
+            self.latency.record(latency)
+
+        if self.render_pending_since is None:
+            self.render_pending_since = now
+
+        return now
+
+    def dispatched(self, e, started: float):
+        name = e.signal_name
+        if name not in self.dispatch:
+            self.dispatch[name] = Histogram()
+        self.dispatch[name].record(int((self.clock() - started) * 1_000_000))
+
+    def rendered(self, flushed: bool):
+        if self.render_pending_since is None:
+            return
+
+        if flushed:
+            self.dispatch_to_render.record(int((self.clock() - self.render_pending_since) * 1_000_000))
+        self.render_pending_since = None
+
+    def summary(self) -> typing.Dict:
+        return {
+            'signals': dict(self.signals),
+            'queue_depth': self.queue_depth.summary(),
+            'input_to_dispatch_us': {name: histogram.summary() for name, histogram in list(self.input_to_dispatch.items())},
+            'dispatch_us': {name: histogram.summary() for name, histogram in list(self.dispatch.items())},
+            'dispatch_to_render_us': self.dispatch_to_render.summary()
+        }
+
+    def overlay_text(self) -> str:
+        return '\n'.join([
+            f'events {sum(self.signals.values())} queue p99 {self.queue_depth.percentile(0.99)}',
+            f'input>dispatch p99 {self.latency.percentile(0.99)}us',
+            f'dispatch>render p99 {self.dispatch_to_render.percentile(0.99) / 1000:.1f}ms'
+        ])
+
+
+def dump(data: typing.Dict, stream: typing.TextIO = sys.stderr):
+    stream.write(json.dumps(data, sort_keys=True) + '\n')
+    stream.flush()
+
+
+def dump_on_signal(callback: typing.Callable) -> bool:
+    if not hasattr(signal, 'SIGUSR1'):
+        return False
+
+    signal.signal(signal.SIGUSR1, lambda *_: callback())
+    return True
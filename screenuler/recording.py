@@ -0,0 +1,93 @@
+import struct
+import time
+import typing
+
+MOTION, PRESS, RELEASE, ENTER, LEAVE, HOTKEY = range(6)
+
+hotkeys = ('SHUTDOWN', 'TOGGLE_ORIENTATION', 'SET_SIZE_1', 'SET_SIZE_2', 'SET_SIZE_3', 'SET_SIZE_4', 'CYCLE_UNIT', 'TOGGLE_LOUPE', 'TOGGLE_SNAP')
+
+magic = b'SCRL'
+version = 1
+
+# magic, format version, record size
+header = struct.Struct('<4sBB')
+# milliseconds since the first record, kind, a, b, c
+record = struct.Struct('<IBhhB')
+
+
+class Recorder:
+    def __init__(self, stream: typing.BinaryIO, buffer_size: int = 64 * 1024):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.buffer = bytearray(header.pack(magic, version, record.size))
+
+        self.started = None
+        self.records = 0
+
+    def record(self, now: float, kind: int, a: int = 0, b: int = 0, c: int = 0):
+        if self.started is None:
+            self.started = now
+
+        self.buffer += record.pack(max(0, round((now - self.started) * 1000)), kind, a, b, c)
+        self.records += 1
+
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        self.stream.write(self.buffer)
+        self.stream.flush()
+        self.buffer.clear()
+
+    def close(self):
+        self.flush()
+        self.stream.close()
+
+
+def read_recording(stream: typing.BinaryIO) -> typing.Iterator[typing.Tuple]:
+    data = stream.read()
+    if len(data) < header.size or header.unpack_from(data) != (magic, version, record.size):
+        raise ValueError('not a screenuler recording')
+
+    body = memoryview(data)[header.size:]
+    body = body[:len(body) - len(body) % record.size]
+
+    for t, kind, a, b, c in record.iter_unpack(body):
+        yield t / 1000, kind, a, b, c
+
+
+def deliver(gui, now: float, kind: int, a: int, b: int, c: int):
+    if kind == MOTION:
+        gui.on_motion(a, b, now)
+    elif kind == PRESS:
+        gui.on_arrow_press((a, b), c, now)
+    elif kind == RELEASE:
+        gui.on_arrow_release((a, b), now)
+    elif kind == ENTER:
+        gui.on_enter(now)
+    elif kind == LEAVE:
+        gui.on_leave(now)
+    elif kind == HOTKEY:
+        gui.on_hotkey(hotkeys[a], now)
+
+
+def replay(records: typing.Iterable[typing.Tuple], gui, realtime: bool = False, pump: typing.Optional[typing.Callable] = None, clock: typing.Callable = time.perf_counter, sleep: typing.Callable = time.sleep) -> int:
+    started = clock()
+    count = 0
+
+    for now, kind, a, b, c in records:
+        if realtime:
+            delay = now - (clock() - started)
+            while delay > 0:
+                if pump is not None:
+                    pump()
+                sleep(min(0.001, delay))
+                delay = now - (clock() - started)
+
+        deliver(gui, now, kind, a, b, c)
+        count += 1
+
+        if pump is not None:
+            pump()
+
+    return count
@@ -0,0 +1,76 @@
+import _tkinter
+import asyncio
+import typing
+
+
+class AsyncioRuntime:
+    # Tkinter exposes no descriptor for the window system connection, so Tk is polled. The interval
+    # doubles while Tk stays idle up to max_poll_interval, which bounds both the idle wakeups and the
+    # extra latency of the first input after a quiet spell. Loop callbacks pump Tk right after they
+    # run, so redraws caused by timers and statecharts never wait for the next poll.
+    def __init__(self, root, loop: typing.Optional[asyncio.AbstractEventLoop] = None, poll_interval: float = 0.004, max_poll_interval: float = 0.025, max_events: int = 64):
+        self.root = root
+        self.loop = loop or asyncio.new_event_loop()
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.max_events = max_events
+
+        self.interval = poll_interval
+        self.stopped = False
+
+        self.pumps = 0
+        self.tk_events = 0
+
+    def _pumping(self, callback: typing.Callable) -> typing.Callable:
+        def run():
+            callback()
+            if not self.stopped:
+                self.interval = self.poll_interval
+                self.pump_tk()
+
+        return run
+
+    def schedule(self, delay: int, callback: typing.Callable) -> asyncio.TimerHandle:
+        return self.loop.call_later(delay / 1000, self._pumping(callback))
+
+    def call_soon(self, callback: typing.Callable) -> asyncio.Handle:
+        return self.loop.call_soon(self._pumping(callback))
+
+    def quit(self):
+        self.stopped = True
+
+    def pump_tk(self) -> int:
+        handled = 0
+        while handled < self.max_events and self.root.tk.dooneevent(_tkinter.DONT_WAIT):
+            handled += 1
+
+        self.pumps += 1
+        self.tk_events += handled
+        return handled
+
+    def next_interval(self, handled: int) -> float:
+        if handled == self.max_events:
+            # a full batch means more Tk events are likely waiting, only yield to the loop
+            return 0
+        if handled:
+            self.interval = self.poll_interval
+        else:
+            self.interval = min(self.max_poll_interval, self.interval * 2)
+        return self.interval
+
+    async def pump(self):
+        while not self.stopped:
+            await asyncio.sleep(self.next_interval(self.pump_tk()))
+
+    def run(self):
+        self.stopped = False
+        try:
+            self.loop.run_until_complete(self.pump())
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+
+    def close(self):
+        self.loop.close()
+
+    def stats(self) -> typing.Dict:
+        return {'pumps': self.pumps, 'tk_events': self.tk_events}
@@ -0,0 +1,26 @@
+import time
+import typing
+
+
+class StartupProfile:
+    def __init__(self, clock: typing.Callable = time.perf_counter):
+        self.clock = clock
+        self.started = clock()
+        self.last = self.started
+        self.phases = []
+
+    def mark(self, phase: str):
+        now = self.clock()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def total(self) -> float:
+        return self.last - self.started
+
+    def report(self) -> str:
+        lines = [f'{phase:>12}: {duration * 1000:8.1f} ms' for phase, duration in self.phases]
+        lines.append(f'{"total":>12}: {self.total() * 1000:8.1f} ms')
+        return '\n'.join(lines)
+
+
+startup_profile = StartupProfile()
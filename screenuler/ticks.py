@@ -0,0 +1,55 @@
+import typing
+
+
+def visible_span(offset: int, length: int, viewport: int, margin: int = 0) -> typing.Tuple:
+    start = max(0, -offset - margin)
+    end = min(length, viewport - offset + margin)
+
+    return start, max(start, end)
+
+
+def aligned_range(start: int, end: int, step: int) -> range:
+    return range(-(-start // step) * step, end + 1, step)
+
+
+class TickPool:
+    def __init__(self, create: typing.Callable, place: typing.Callable, hide: typing.Callable):
+        self.create = create
+        self.place = place
+        self.hide = hide
+
+        self.placed = {}
+        self.free = []
+
+    def __len__(self) -> int:
+        return len(self.placed) + len(self.free)
+
+    def render(self, positions: range):
+        already_free = len(self.free)
+
+        for pos in [pos for pos in self.placed if pos not in positions]:
+            self.free.append(self.placed.pop(pos))
+
+        for pos in positions:
+            if pos in self.placed:
+                continue
+
+            if self.free:
+                item = self.free.pop()
+                self.place(item, pos)
+            else:
+                item = self.create(pos)
+
+            self.placed[pos] = item
+
+        for item in self.free[already_free:]:
+            self.hide(item)
+
+    def clear(self):
+        self.render(range(0))
+
+    def drain(self) -> typing.List:
+        items = [*self.placed.values(), *self.free]
+        self.placed.clear()
+        self.free.clear()
+        return items
@@ -0,0 +1,96 @@
+import unittest
+
+from screenuler.commands import GuiCommandQueue
+
+
+class RecordingGui:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, *args))
+
+
+class TestGuiCommandQueue(unittest.TestCase):
+    def setUp(self):
+        self.gui = RecordingGui()
+        self.commands = GuiCommandQueue(self.gui)
+
+    def test_nothing_is_executed_before_drain(self):
+        self.commands.move(1, 0, 1)
+        self.commands.update_position_markers(10)
+
+        assert [] == self.gui.calls
+
+    def test_moves_are_collapsed_into_net_displacement(self):
+        self.commands.move(1, 0, 10)
+        self.commands.move(1, 0, 10)
+        self.commands.move(0, -1, 25)
+
+        assert 1 == self.commands.drain()
+        assert [('move', 20, -25, 1)] == self.gui.calls
+
+    def test_unit_cycles_are_summed_and_run_after_resize(self):
+        self.commands.cycle_unit()
+        self.commands.make_vertical(2)
+        self.commands.cycle_unit()
+
+        assert 2 == self.commands.drain()
+        assert [('make_vertical', 2), ('cycle_unit', 2)] == self.gui.calls
+
+    def test_loupe_toggles_are_counted(self):
+        self.commands.toggle_loupe()
+        self.commands.toggle_loupe()
+        self.commands.drain()
+
+        assert [('toggle_loupe', 2)] == self.gui.calls
+
+    def test_only_latest_marker_update_is_executed(self):
+        for pos in range(10):
+            self.commands.update_position_markers(pos, 'vertical')
+        self.commands.drain()
+
+        assert [('update_position_markers', 9, 'vertical')] == self.gui.calls
+        assert 10 == self.commands.enqueued
+        assert 1 == self.commands.executed
+
+    def test_layout_change_drops_pending_marker_update(self):
+        self.commands.update_position_markers(10, 'horizontal')
+        self.commands.make_vertical(2)
+        self.commands.drain()
+
+        assert [('make_vertical', 2)] == self.gui.calls
+
+    def test_batch_is_executed_in_fixed_order(self):
+        self.commands.quit()
+        self.commands.hide_external_marker()
+        self.commands.update_position_markers(5)
+        self.commands.move(0, 1, 1)
+        self.commands.make_horizontal(3)
+        self.commands.show_external_marker()
+        self.commands.drain()
+
+        assert [('make_horizontal', 3), ('move', 0, 1, 1), ('show_external_marker',), ('quit',)] == self.gui.calls
+
+    def test_on_dirty_fires_once_per_batch(self):
+        woken = []
+        commands = GuiCommandQueue(self.gui, on_dirty=lambda: woken.append(True))
+
+        commands.move(1, 1, 1)
+        commands.update_position_markers(5)
+        commands.toggle_snap()
+        assert 1 == len(woken)
+
+        commands.drain()
+        commands.cycle_unit()
+        assert 2 == len(woken)
+
+    def test_drain_is_empty_after_batch(self):
+        self.commands.move(1, 1, 1)
+        self.commands.drain()
+
+        assert 0 == self.commands.drain()
+
+
+if __name__ == '__main__':
+    unittest.main()
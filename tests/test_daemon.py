@@ -0,0 +1,245 @@
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import tkinter
+import unittest
+
+from screenuler.app import GlobalBus
+from screenuler.app import RulerGroup
+from screenuler.app import Statechart
+from screenuler.app import TestableGui
+from screenuler.app import horizontal_state
+from screenuler.app import init_state
+from screenuler.app import vertical_state
+from screenuler.geometry import WindowGeometry
+from screenuler.client import send
+from screenuler.daemon import Daemon
+from screenuler.daemon import DaemonService
+from screenuler.daemon import RulerService
+
+
+class RecordingGui(TestableGui):
+    def __init__(self, bus: GlobalBus, on_quit=None):
+        super().__init__(bus=bus)
+        self.calls = []
+
+    def show(self):
+        self.calls.append('show')
+
+    def hide(self):
+        self.calls.append('hide')
+
+    def make_horizontal(self, size: int = 1):
+        self.calls.append(('make_horizontal', size))
+
+    def make_vertical(self, size: int = 1):
+        self.calls.append(('make_vertical', size))
+
+    def move(self, x, y, speedup: int = 0):
+        self.calls.append(('move', x, y, speedup))
+
+
+class QueuedMoveGui(RecordingGui):
+    def __init__(self, bus: GlobalBus):
+        super().__init__(bus=bus)
+        self.geometry = WindowGeometry(250, 75, 0, 0)
+        self.pending = []
+
+    def move(self, x, y, speedup: int = 0):
+        self.pending.append((x * speedup, y * speedup))
+
+    def flush(self) -> int:
+        for dx, dy in self.pending:
+            self.geometry.request(self.geometry.width, self.geometry.height, self.geometry.x + dx, self.geometry.y + dy)
+        executed, self.pending = len(self.pending), []
+        return executed
+
+
+class TestRulerService(unittest.TestCase):
+    def setUp(self):
+        bus = GlobalBus()
+        self.statechart = Statechart('statechart', bus=bus, synchronous=True)
+        self.gui = RecordingGui(bus=bus)
+        self.statechart.start_at(init_state)
+        self.gui.calls.clear()
+
+        self.service = RulerService(statechart=self.statechart, gui=self.gui)
+
+    def test_open_configures_and_shows_ruler(self):
+        response = self.service.handle({'command': 'open', 'args': {'orientation': 'vertical', 'size': 2}})
+
+        assert {'ok': True, 'orientation': 'vertical'} == response
+        assert self.statechart.state.fun is vertical_state
+        assert [('make_vertical', 1), ('make_vertical', 2), 'show'] == self.gui.calls
+
+    def test_configure_same_orientation_does_not_toggle(self):
+        self.service.handle({'command': 'configure', 'args': {'orientation': 'horizontal', 'size': 3}})
+
+        assert self.statechart.state.fun is horizontal_state
+        assert [('make_horizontal', 3)] == self.gui.calls
+
+    def test_relative_move(self):
+        self.service.handle({'command': 'move', 'args': {'dx': 10, 'dy': -5}})
+
+        assert [('move', 10, -5, 1)] == self.gui.calls
+
+    def test_absolute_moves_account_for_queued_moves(self):
+        bus = GlobalBus()
+        statechart = Statechart('statechart', bus=bus, synchronous=True)
+        gui = QueuedMoveGui(bus=bus)
+        statechart.start_at(init_state)
+        service = RulerService(statechart=statechart, gui=gui)
+
+        service.handle({'command': 'move', 'args': {'x': 100, 'y': 50}})
+        service.handle({'command': 'move', 'args': {'x': 120}})
+        gui.flush()
+
+        assert (120, 50) == gui.geometry.position
+
+    def test_close_hides_ruler(self):
+        self.service.handle({'command': 'close'})
+
+        assert ['hide'] == self.gui.calls
+
+    def test_invalid_requests_are_reported(self):
+        assert not self.service.handle({'command': 'explode'})['ok']
+        assert not self.service.handle({'command': 'configure', 'args': {'size': 9}})['ok']
+        assert not self.service.handle({'command': 'close', 'args': {'unexpected': 1}})['ok']
+
+
+class TestDaemonService(unittest.TestCase):
+    def setUp(self):
+        self.quits = []
+        self.group = RulerGroup(make_gui=RecordingGui, schedule=lambda delay, callback: None)
+        self.group.add()
+        self.service = DaemonService(group=self.group, quit=lambda: self.quits.append(True))
+
+    def test_open_reuses_hidden_ruler_then_creates_new_ones(self):
+        first = self.service.handle({'command': 'open'})
+        second = self.service.handle({'command': 'open', 'args': {'orientation': 'vertical'}})
+
+        assert (1, 2) == (first['id'], second['id'])
+        assert 'vertical' == second['orientation']
+        assert [1, 2] == list(self.group.rulers)
+
+    def test_commands_default_to_last_opened_ruler(self):
+        self.service.handle({'command': 'open'})
+        self.service.handle({'command': 'open'})
+        self.service.handle({'command': 'open', 'id': 1})
+
+        response = self.service.handle({'command': 'close'})
+
+        assert 1 == response['id']
+        assert 'hide' == self.group.get(1).gui.calls[-1]
+
+    def test_closed_ruler_is_reused(self):
+        self.service.handle({'command': 'open'})
+        self.service.handle({'command': 'open'})
+        self.service.handle({'command': 'close', 'id': 1})
+
+        assert 1 == self.service.handle({'command': 'open'})['id']
+
+    def test_list_and_unknown_ruler(self):
+        self.service.handle({'command': 'open', 'args': {'orientation': 'vertical'}})
+
+        assert {'ok': True, 'rulers': [{'id': 1, 'orientation': 'vertical', 'visible': True}]} == self.service.handle({'command': 'list'})
+        assert not self.service.handle({'command': 'move', 'id': 7})['ok']
+
+    def test_metrics_are_reported_per_ruler(self):
+        group = RulerGroup(make_gui=RecordingGui, schedule=lambda delay, callback: None, with_metrics=True)
+        group.add()
+        service = DaemonService(group=group, quit=lambda: None)
+        service.handle({'command': 'configure', 'args': {'size': 2}})
+
+        assert {'SET_SIZE_2': 1} == service.handle({'command': 'metrics'})['metrics'][1]['signals']
+
+    def test_quit_stops_daemon(self):
+        assert self.service.handle({'command': 'quit'})['ok']
+        assert [True] == self.quits
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.root = tkinter.Tcl()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'screenuler.sock')
+        group = RulerGroup(make_gui=RecordingGui, schedule=lambda delay, callback: None)
+        group.add()
+        self.service = DaemonService(group=group, quit=lambda: None)
+        self.daemon = Daemon(root=self.root, service=self.service, path=self.path, request_timeout=2000)
+
+    def tearDown(self):
+        self.daemon.close()
+        self.directory.cleanup()
+
+    def request(self, request):
+        responses = []
+        client = threading.Thread(target=lambda: responses.append(send(request, path=self.path)))
+        client.start()
+        deadline = time.monotonic() + 5
+        while client.is_alive() and time.monotonic() < deadline:
+            self.root.update()
+            time.sleep(0.001)
+        client.join()
+        return responses[0]
+
+    def test_request_is_answered_while_another_client_stalls(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stalled:
+            stalled.connect(self.path)
+            stalled.sendall(b'{"command": ')
+
+            started = time.monotonic()
+            response = self.request({'command': 'list'})
+
+            assert response['ok']
+            assert time.monotonic() - started < 1.0
+
+    def test_requests_that_are_not_objects_are_answered(self):
+        for request in (b'[]\n', b'"x"\n', b'1\n'):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.settimeout(2)
+                client.connect(self.path)
+                client.sendall(request)
+                for _ in range(100):
+                    self.root.update()
+                with client.makefile('r') as f:
+                    assert {'ok': False, 'error': 'request must be a JSON object'} == json.loads(f.readline())
+
+    def test_responses_larger_than_the_socket_buffer_arrive_whole(self):
+        self.service.handle = lambda request: {'ok': True, 'padding': 'x' * (4 << 20)}
+
+        response = self.request({'command': 'list'})
+
+        assert 4 << 20 == len(response['padding'])
+
+    def test_second_daemon_refuses_a_live_socket(self):
+        with self.assertRaises(RuntimeError):
+            Daemon(root=self.root, service=self.service, path=self.path)
+
+        assert self.request({'command': 'ping'})['ok']
+
+    def test_stale_socket_is_replaced(self):
+        self.daemon.close()
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.path)
+        stale.close()
+
+        self.daemon = Daemon(root=self.root, service=self.service, path=self.path)
+
+        assert self.request({'command': 'ping'})['ok']
+
+    def test_close_leaves_a_replaced_socket_alone(self):
+        os.unlink(self.path)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as other:
+            other.bind(self.path)
+
+            self.daemon.close()
+
+            assert os.path.exists(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+from array import array
+
+from screenuler.app import Gui
+from screenuler.edges import EdgeIndex
+from screenuler.edges import find_edges
+from screenuler.edges import nearest_edge
+from screenuler.geometry import WindowGeometry
+
+
+def strip(*runs):
+    return b''.join(bytes([value] * 3) * count for value, count in runs)
+
+
+class TestEdges(unittest.TestCase):
+    def test_edges_are_first_pixels_of_new_regions(self):
+        pixels = strip((255, 10), (0, 5), (255, 10))
+
+        assert [10, 15] == list(find_edges(pixels))
+
+    def test_soft_edges_snap_to_the_steepest_step(self):
+        pixels = strip((200, 4), (180, 1), (60, 1), (40, 4))
+
+        assert [5] == list(find_edges(pixels))
+
+    def test_noise_below_threshold_is_ignored(self):
+        pixels = strip((100, 3), (110, 3), (100, 3))
+
+        assert [] == list(find_edges(pixels))
+
+    def test_nearest_edge_within_radius(self):
+        edges = array('i', [10, 40, 100])
+
+        assert 40 == nearest_edge(edges, 35, radius=8)
+        assert 40 == nearest_edge(edges, 47, radius=8)
+        assert 70 == nearest_edge(edges, 70, radius=8)
+        assert 5 == nearest_edge(array('i'), 5, radius=8)
+
+    def test_strip_is_scanned_once_until_it_moves(self):
+        grabs = []
+
+        def capture(left, top, width, height):
+            grabs.append((left, top, width, height))
+            return strip((0, 20), (255, 20))
+
+        index = EdgeIndex(capture=capture)
+
+        assert 20 == index.snap(17, (0, 0, 40, 1))
+        assert 20 == index.snap(25, (0, 0, 40, 1))
+        assert 3 == index.snap(3, (0, 0, 40, 1))
+        index.snap(3, (10, 0, 40, 1))
+
+        assert [(0, 0, 40, 1), (10, 0, 40, 1)] == grabs
+        assert {'lookups': 4, 'scans': 2} == index.stats()
+
+    def test_failed_capture_does_not_snap(self):
+        index = EdgeIndex(capture=lambda *_: None)
+
+        assert 12 == index.snap(12, (0, 0, 40, 1))
+
+
+class FakeMarker:
+    def __init__(self):
+        self.position = None
+
+    def move_to(self, x, y):
+        self.position = (x, y)
+
+
+class SamplingGui(Gui):
+    def __init__(self, capture):
+        self.geometry = WindowGeometry(250, 75, 300, 200)
+        self.client_offset = (3, 20)
+        self.persistent_markers = True
+        self.snap_enabled = True
+        self.edge_index = EdgeIndex(capture=capture)
+        self.external_marker = FakeMarker()
+        self.loupe_point = None
+
+    def _move_position_markers(self, pos, direction):
+        pass
+
+    def _update_loupe(self):
+        pass
+
+
+class TestSamplePoint(unittest.TestCase):
+    def test_snap_strip_and_loupe_sample_the_same_pixels(self):
+        grabs = []
+        gui = SamplingGui(capture=lambda *strip: grabs.append(strip))
+
+        gui.update_position_markers(40, 'horizontal')
+        left, top, width, height = grabs.pop()
+        assert (left + 40, top) == gui.loupe_point
+        assert (250, 1) == (width, height)
+
+        gui.update_position_markers(40, 'vertical')
+        left, top, width, height = grabs.pop()
+        assert (left, top + 40) == gui.loupe_point
+        assert (1, 75) == (width, height)
+
+    def test_sample_point_lies_just_past_the_external_marker(self):
+        gui = SamplingGui(capture=lambda *_: None)
+
+        gui.update_position_markers(40, 'horizontal')
+        assert (343, 175) == gui.external_marker.position
+        assert (343, 174) == gui.loupe_point
+
+        gui.update_position_markers(40, 'vertical')
+        assert (375, 260) == gui.external_marker.position
+        assert (425, 260) == gui.loupe_point
+
+
+if __name__ == '__main__':
+    unittest.main()
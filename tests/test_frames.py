@@ -0,0 +1,66 @@
+import unittest
+
+from screenuler.frames import FramePacer
+
+
+class TestFramePacer(unittest.TestCase):
+    def setUp(self):
+        self.pacer = FramePacer(fps=50)
+
+    def test_next_frame_is_scheduled_on_the_frame_deadline(self):
+        self.pacer.begin(0.0)
+
+        assert 15 == self.pacer.end(0.005, flushed=True)
+
+    def test_slow_frame_schedules_next_immediately(self):
+        self.pacer.begin(0.0)
+
+        assert 0 == self.pacer.end(0.030, flushed=True)
+
+    def test_late_frames_are_counted_as_dropped(self):
+        self.pacer.begin(0.0)
+        self.pacer.end(0.001, flushed=False)
+        self.pacer.begin(0.075)
+
+        assert 2 == self.pacer.dropped
+        assert 5 == self.pacer.end(0.075, flushed=False)
+
+    def test_stop_restarts_the_deadline_without_counting_dropped_frames(self):
+        self.pacer.begin(0.0)
+        self.pacer.end(0.001, flushed=False)
+        self.pacer.stop()
+        self.pacer.begin(10.0)
+
+        assert 0 == self.pacer.dropped
+        assert 20 == self.pacer.end(10.0, flushed=True)
+
+    def test_fps_must_be_positive(self):
+        for fps in (0, -60):
+            with self.assertRaises(ValueError):
+                FramePacer(fps=fps)
+
+    def test_summary_only_times_frames_that_flushed(self):
+        self.pacer.begin(0.0)
+        self.pacer.end(0.004, flushed=True)
+        self.pacer.begin(0.020)
+        self.pacer.end(0.021, flushed=False)
+
+        summary = self.pacer.summary()
+
+        assert 2 == summary['frames']
+        assert 1 == summary['flushed']
+        assert 0 == summary['dropped']
+        assert abs(summary['max_ms'] - 4.0) < 1e-6
+
+    def test_frame_history_is_bounded(self):
+        pacer = FramePacer(fps=50, history=10)
+        for i in range(100):
+            pacer.begin(i * 0.02)
+            pacer.end(i * 0.02 + 0.001, flushed=True)
+
+        assert 10 == len(pacer.durations)
+        assert 100 == pacer.flushed
+
+
+if __name__ == '__main__':
+    unittest.main()
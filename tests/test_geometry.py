@@ -0,0 +1,62 @@
+import unittest
+
+from screenuler.geometry import WindowGeometry
+
+
+class TestWindowGeometry(unittest.TestCase):
+    def test_from_string(self):
+        geometry = WindowGeometry.from_string('250x75+10+20')
+
+        assert (250, 75) == geometry.size
+        assert (10, 20) == geometry.position
+        assert '250x75+10+20' == str(geometry)
+
+    def test_request_updates_model_immediately(self):
+        geometry = WindowGeometry()
+
+        assert '250x75+10+20' == geometry.request(250, 75, 10, 20)
+        assert (10, 20) == geometry.position
+
+    def test_configure_for_stale_request_keeps_latest_request(self):
+        geometry = WindowGeometry()
+        geometry.request(250, 75, 10, 0)
+        geometry.request(250, 75, 20, 0)
+
+        assert not geometry.configure(250, 75, 10, 0)
+        assert (20, 0) == geometry.position
+
+        assert not geometry.configure(250, 75, 20, 0)
+        assert 0 == len(geometry.requested)
+
+    def test_many_outstanding_requests_are_all_matched(self):
+        geometry = WindowGeometry()
+        for x in range(0, 200, 10):
+            geometry.request(250, 75, x, 0)
+
+        for x in range(0, 190, 10):
+            assert not geometry.configure(250, 75, x, 0)
+            assert (190, 0) == geometry.position
+
+        assert 1 == len(geometry.requested)
+
+    def test_unanswered_requests_expire(self):
+        now = [0.0]
+        geometry = WindowGeometry(clock=lambda: now[0], expiry=1.0)
+        geometry.request(250, 75, 10, 0)
+        now[0] = 2.0
+        geometry.request(250, 75, 20, 0)
+
+        assert 1 == len(geometry.requested)
+        assert geometry.configure(250, 75, 10, 0)
+
+    def test_configure_from_window_manager_is_accepted(self):
+        geometry = WindowGeometry()
+        geometry.request(250, 75, 10, 0)
+
+        assert geometry.configure(250, 75, 300, 400)
+        assert (300, 400) == geometry.position
+        assert 0 == len(geometry.requested)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import argparse
 import unittest
 
 from screenuler import helpers
@@ -12,5 +13,12 @@ class TestHelpers(unittest.TestCase):
         assert (1, 1) == helpers.get_size('1x1+0+0')
         assert (0, 0) == helpers.get_size('0x0+1+1')
 
+    def test_positive_float(self):
+        assert 30.0 == helpers.positive_float('30')
+
+        for value in ('0', '-60', 'nan', 'fast'):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                helpers.positive_float(value)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,125 @@
+import unittest
+
+from screenuler.inputs import MoveAccumulator
+from screenuler.inputs import PointerCoalescer
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.callbacks = []
+
+    def __call__(self, interval, callback):
+        self.callbacks.append(callback)
+
+    def fire(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+class TestPointerCoalescer(unittest.TestCase):
+    def setUp(self):
+        self.emitted = []
+        self.scheduler = FakeScheduler()
+        self.coalescer = PointerCoalescer(emit=self.emitted.append, schedule=self.scheduler)
+
+    def test_only_latest_position_is_emitted_per_interval(self):
+        for x in range(100):
+            self.coalescer.push((x, 0))
+
+        assert [] == self.emitted
+        assert 1 == len(self.scheduler.callbacks)
+
+        self.scheduler.fire()
+
+        assert [(99, 0)] == self.emitted
+        assert {'received': 100, 'emitted': 1, 'merged': 99} == self.coalescer.stats()
+
+    def test_next_interval_is_scheduled_after_flush(self):
+        self.coalescer.push((1, 1))
+        self.scheduler.fire()
+        self.coalescer.push((2, 2))
+        self.scheduler.fire()
+
+        assert [(1, 1), (2, 2)] == self.emitted
+        assert 0 == self.coalescer.merged
+
+    def test_flush_without_pending_position_emits_nothing(self):
+        self.coalescer.flush()
+
+        assert [] == self.emitted
+
+    def test_zero_interval_disables_coalescing(self):
+        self.coalescer.interval = 0
+        self.coalescer.push((1, 1))
+        self.coalescer.push((2, 2))
+
+        assert [(1, 1), (2, 2)] == self.emitted
+        assert [] == self.scheduler.callbacks
+
+
+class TestMoveAccumulator(unittest.TestCase):
+    def setUp(self):
+        self.emitted = []
+        self.scheduler = FakeScheduler()
+        self.accumulator = MoveAccumulator(emit=self.emitted.append, schedule=self.scheduler, acceleration=20.0)
+
+    def test_single_press_moves_by_speedup(self):
+        self.accumulator.press((1, 0), 10, now=0.0)
+        self.scheduler.fire()
+
+        assert [(10, 0)] == self.emitted
+
+    def test_presses_within_interval_are_merged(self):
+        self.accumulator.press((1, 0), 1, now=0.0)
+        self.accumulator.release((1, 0), now=0.1)
+        self.accumulator.press((0, 1), 1, now=0.2)
+        self.accumulator.release((0, 1), now=0.3)
+        self.accumulator.press((-1, 0), 1, now=0.4)
+        self.scheduler.fire()
+
+        assert [(0, 1)] == self.emitted
+        assert {'received': 3, 'emitted': 1} == self.accumulator.stats()
+
+    def test_autorepeat_accelerates(self):
+        self.accumulator.press((1, 0), 1, now=0.0)
+        for i in range(1, 11):
+            now = 0.5 + i * 0.03
+            self.accumulator.release((1, 0), now=now)
+            self.accumulator.press((1, 0), 1, now=now)
+        self.scheduler.fire()
+
+        (dx, dy), = self.emitted
+        assert dx > 100
+        assert 0 == dy
+
+    def test_autorepeat_reaches_across_a_4k_screen_within_a_second(self):
+        self.accumulator.press((1, 0), 25, now=0.0)
+        now = 0.5
+        while now < 1.0:
+            self.accumulator.release((1, 0), now=now)
+            self.accumulator.press((1, 0), 25, now=now)
+            now += 1 / 30
+        self.scheduler.fire()
+
+        assert self.emitted[0][0] >= 3840
+
+    def test_new_press_after_release_restarts_acceleration(self):
+        self.accumulator.press((1, 0), 1, now=0.0)
+        self.accumulator.release((1, 0), now=1.0)
+        self.accumulator.press((1, 0), 1, now=2.0)
+        self.scheduler.fire()
+
+        assert [(2, 0)] == self.emitted
+
+    def test_zero_acceleration_keeps_fixed_steps(self):
+        self.accumulator.acceleration = 0
+        self.accumulator.press((0, -1), 1, now=0.0)
+        self.accumulator.press((0, -1), 1, now=5.0)
+        self.scheduler.fire()
+
+        assert [(0, -2)] == self.emitted
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from screenuler.layout import format_position
+from screenuler.layout import pixels_per_unit
+from screenuler.layout import tick_layout
+
+
+class TestLayout(unittest.TestCase):
+    def test_px_layout_matches_tick_step_and_labels_every_50px(self):
+        layout = tick_layout(250, 'px', step=10)
+
+        assert list(range(0, 251, 10)) == list(layout.positions)
+        assert {25} == set(layout.lengths)
+        assert [0, 50, 100, 150, 200, 250] == list(layout.label_positions)
+        assert ('0', '50', '100', '150', '200', '250') == layout.labels
+
+    def test_mm_layout_has_three_tick_lengths(self):
+        layout = tick_layout(200, 'mm', dpi=127)
+
+        assert [0, 5, 10, 15] == list(layout.positions[:4])
+        assert [25, 10, 10, 10, 10, 17, 10, 10, 10, 10, 25] == list(layout.lengths[:11])
+        assert ('mm', '10', '20', '30', '40') == layout.labels
+        assert [0, 50, 100, 150, 200] == list(layout.label_positions)
+
+    def test_zoom_scales_positions_but_not_labels(self):
+        layout = tick_layout(100, 'px', zoom=2.0, step=25)
+
+        assert [0, 50, 100] == list(layout.positions)
+        assert ('0', '50') == layout.labels
+
+    def test_layouts_are_memoized(self):
+        assert tick_layout(3840, 'in', 110.0) is tick_layout(3840, 'in', 110.0)
+        assert tick_layout(3840, 'in', 110.0) is not tick_layout(3840, 'pt', 110.0)
+
+    def test_rebuilt_layouts_keep_the_same_key(self):
+        layout = tick_layout(300, 'in', dpi=96)
+        tick_layout.cache_clear()
+        rebuilt = tick_layout(300, 'in', dpi=96)
+
+        assert layout is not rebuilt
+        assert (300, 'in', 96, 1.0, 10) == layout.key == rebuilt.key
+
+    def test_visible_ranges_are_found_by_bisection(self):
+        layout = tick_layout(1000, 'px', step=10)
+
+        assert range(3, 11) == layout.tick_range(25, 100)
+        assert range(1, 3) == layout.label_range(25, 100)
+
+    def test_units(self):
+        assert 96 == pixels_per_unit('in', dpi=96)
+        assert 16 == pixels_per_unit('em', dpi=96)
+        assert 2 == pixels_per_unit('pt', dpi=144)
+        assert '42' == format_position(42)
+        assert '10.0' == format_position(50, 'mm', dpi=127)
+        with self.assertRaises(ValueError):
+            pixels_per_unit('furlong')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import importlib.util
+import unittest
+
+from screenuler.loupe import Loupe
+from screenuler.loupe import available
+
+
+class FakeScreen:
+    def __init__(self):
+        self.grabs = []
+
+    def __call__(self, left, top, width, height):
+        self.grabs.append((left, top, width, height))
+        return bytes((left + x) % 256 for _ in range(height) for x in range(width) for _ in range(3))
+
+
+class TestLoupe(unittest.TestCase):
+    def test_captures_are_written_into_one_reused_ppm_buffer(self):
+        screen = FakeScreen()
+        loupe = Loupe(capture=screen, radius=1, factor=4)
+        frame, pixels = loupe.frame, loupe.pixels
+
+        loupe.update(10, 10)
+        loupe.update(11, 10)
+
+        assert loupe.frame is frame
+        assert loupe.pixels is pixels
+        assert 12 == loupe.size
+        assert b'P6 3 3 255\n' + screen(10, 9, 3, 3) == loupe.frame
+        assert bytes(loupe.frame) == loupe.source_ppm()
+
+    def test_recaptures_only_when_the_pixel_changes(self):
+        screen = FakeScreen()
+        loupe = Loupe(capture=screen, radius=7, factor=8)
+
+        assert loupe.update(100, 50)
+        assert not loupe.update(100, 50)
+        assert loupe.update(101, 50)
+
+        assert [(93, 43, 15, 15), (94, 43, 15, 15)] == screen.grabs
+        assert {'requested': 3, 'captured': 2} == loupe.stats()
+
+    def test_failed_capture_is_retried(self):
+        loupe = Loupe(capture=lambda *_: None)
+
+        assert not loupe.update(0, 0)
+        assert loupe.center is None
+
+    def test_available_reports_whether_pillow_can_be_imported(self):
+        assert (importlib.util.find_spec('PIL') is not None) == available()
+
+    def test_reset_forces_recapture(self):
+        screen = FakeScreen()
+        loupe = Loupe(capture=screen)
+        loupe.update(5, 5)
+        loupe.reset()
+        loupe.update(5, 5)
+
+        assert 2 == len(screen.grabs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+
+from screenuler.marker import ExternalMarkerUpdater
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.callbacks = []
+
+    def __call__(self, delay, callback):
+        self.callbacks.append((delay, callback))
+
+    def fire(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for _, callback in callbacks:
+            callback()
+
+
+class TestExternalMarkerUpdater(unittest.TestCase):
+    def setUp(self):
+        self.geometries = []
+        self.visibility = []
+        self.clock = FakeClock()
+        self.scheduler = FakeScheduler()
+        self.updater = ExternalMarkerUpdater(
+            apply_geometry=self.geometries.append,
+            apply_visible=self.visibility.append,
+            schedule=self.scheduler,
+            min_interval=0.1,
+            debounce=0.05,
+            clock=self.clock
+        )
+
+    def test_first_move_is_applied_immediately(self):
+        self.updater.resize(1, 50)
+
+        assert ['1x50+0+0'] == self.geometries
+
+    def test_unchanged_geometry_is_skipped(self):
+        self.updater.move_to(10, 20)
+        self.clock.now = 1.0
+        self.updater.move_to(10, 20)
+
+        assert ['0x0+10+20'] == self.geometries
+        assert {'requested': 2, 'applied': 1, 'skipped': 1} == self.updater.stats()
+
+    def test_moves_are_rate_limited_to_latest_position(self):
+        self.updater.move_to(1, 0)
+        for x in range(2, 10):
+            self.clock.now += 0.01
+            self.updater.move_to(x, 0)
+
+        assert ['0x0+1+0'] == self.geometries
+        assert 1 == len(self.scheduler.callbacks)
+        assert 90 == self.scheduler.callbacks[0][0]
+
+        self.clock.now = 0.1
+        self.scheduler.fire()
+
+        assert ['0x0+1+0', '0x0+9+0'] == self.geometries
+
+    def test_visibility_flapping_is_debounced(self):
+        self.updater.set_visible(True)
+        self.updater.set_visible(False)
+        self.updater.set_visible(True)
+
+        assert [] == self.visibility
+
+        self.scheduler.fire()
+
+        assert [True] == self.visibility
+
+    def test_visibility_toggle_back_to_applied_state_does_nothing(self):
+        self.updater.set_visible(True)
+        self.scheduler.fire()
+        self.updater.set_visible(False)
+        self.updater.set_visible(True)
+        self.scheduler.fire()
+
+        assert [True] == self.visibility
+
+
+if __name__ == '__main__':
+    unittest.main()
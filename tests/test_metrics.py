@@ -0,0 +1,110 @@
+import io
+import json
+import unittest
+from unittest import mock
+
+from miros import ActiveObject
+from miros import Event
+from miros import signals
+
+from screenuler.app import GlobalBus
+from screenuler.app import Statechart
+from screenuler.app import TestableGui
+from screenuler.app import init_state
+from screenuler.metrics import Histogram
+from screenuler.metrics import Metrics
+from screenuler.metrics import dump
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestHistogram(unittest.TestCase):
+    def test_empty(self):
+        assert {'count': 0, 'mean': 0.0, 'p50': 0, 'p99': 0, 'max': 0} == Histogram().summary()
+
+    def test_percentiles_are_bucket_upper_bounds(self):
+        histogram = Histogram()
+        for value in [1] * 98 + [100, 5000]:
+            histogram.record(value)
+
+        assert 1 == histogram.percentile(0.50)
+        assert 127 == histogram.percentile(0.99)
+        assert 5000 == histogram.percentile(1.0)
+        assert 5000 == histogram.max
+
+    def test_huge_values_land_in_last_bucket(self):
+        histogram = Histogram()
+        histogram.record(1 << 40)
+
+        assert 1 == histogram.buckets[-1]
+        assert 1 << 40 == histogram.percentile(0.99)
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.metrics = Metrics(clock=self.clock)
+        bus = GlobalBus()
+        self.statechart = Statechart('statechart', bus=bus, synchronous=True, metrics=self.metrics)
+        self.gui = TestableGui(bus=bus)
+        self.statechart.start_at(init_state)
+
+    def test_counts_signals_sent_through_the_gui(self):
+        for _ in range(3):
+            self.gui.send_event(signal=signals.POINTER_MOVED, payload=(1, 1))
+        self.gui.send_event(signal=signals.TOGGLE_ORIENTATION)
+
+        summary = self.metrics.summary()
+        assert {'POINTER_MOVED': 3, 'TOGGLE_ORIENTATION': 1} == summary['signals']
+        assert 3 == summary['input_to_dispatch_us']['POINTER_MOVED']['count']
+        assert 4 == summary['queue_depth']['count']
+
+    def test_input_to_dispatch_latency(self):
+        e = type('FakeEvent', (), {'signal_name': 'MOVE'})()
+        self.metrics.posted(e)
+        self.clock.now = 0.002
+        self.metrics.dispatched(e, self.metrics.dispatching(e, queue_depth=3))
+
+        assert 2000 == self.metrics.input_to_dispatch['MOVE'].max
+        assert 3 == self.metrics.queue_depth.max
+
+    def test_dispatch_to_render_is_measured_from_first_unrendered_dispatch(self):
+        self.gui.send_event(signal=signals.POINTER_MOVED, payload=(1, 1))
+        self.clock.now = 0.004
+        self.gui.send_event(signal=signals.POINTER_MOVED, payload=(2, 2))
+        self.clock.now = 0.010
+        self.metrics.rendered(flushed=True)
+        self.metrics.rendered(flushed=True)
+
+        assert 1 == self.metrics.dispatch_to_render.count
+        assert 10000 == self.metrics.dispatch_to_render.max
+
+    def test_dispatch_returns_the_base_result_with_metrics(self):
+        e = Event(signal=signals.TOGGLE_ORIENTATION)
+        self.metrics.posted(e)
+
+        with mock.patch.object(ActiveObject, 'dispatch', return_value='handled'):
+            assert 'handled' == self.statechart.dispatch(e)
+
+    def test_dump_writes_one_json_line(self):
+        self.gui.send_event(signal=signals.SET_SIZE_2)
+        stream = io.StringIO()
+        dump(self.metrics.summary(), stream)
+
+        assert {'SET_SIZE_2': 1} == json.loads(stream.getvalue())['signals']
+        assert 1 == stream.getvalue().count('\n')
+
+    def test_overlay_text(self):
+        self.gui.send_event(signal=signals.SET_SIZE_2)
+
+        assert self.metrics.overlay_text().startswith('events 1 ')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import io
+import unittest
+
+from screenuler.app import GlobalBus
+from screenuler.app import Statechart
+from screenuler.app import TestableGui
+from screenuler.app import init_state
+from screenuler.app import vertical_state
+from screenuler.recording import HOTKEY
+from screenuler.recording import MOTION
+from screenuler.recording import PRESS
+from screenuler.recording import Recorder
+from screenuler.recording import header
+from screenuler.recording import read_recording
+from screenuler.recording import record
+from screenuler.recording import replay
+
+
+class MovingGui(TestableGui):
+    def __init__(self, bus: GlobalBus):
+        super().__init__(bus=bus)
+        self.calls = []
+
+    def move(self, x, y, speedup: int = 0):
+        self.calls.append(('move', x, y, speedup))
+
+    def update_position_markers(self, pos, direction='horizontal'):
+        self.calls.append(('marker', pos, direction))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def session(gui: TestableGui):
+    gui.on_enter(10.0)
+    gui.on_motion(12, 30, 10.016)
+    gui.on_arrow_press((1, 0), 10, 10.5)
+    gui.on_arrow_release((1, 0), 10.6)
+    gui.on_hotkey('TOGGLE_ORIENTATION', 11.0)
+    gui.on_motion(5, 40, 11.25)
+    gui.on_leave(12.0)
+
+
+class TestRecording(unittest.TestCase):
+    def make_gui(self):
+        bus = GlobalBus()
+        statechart = Statechart('statechart', bus=bus, synchronous=True)
+        gui = MovingGui(bus=bus)
+        statechart.start_at(init_state)
+        return statechart, gui
+
+    def record_session(self) -> bytes:
+        stream = io.BytesIO()
+        _, gui = self.make_gui()
+        gui.recorder = Recorder(stream)
+        session(gui)
+        gui.recorder.flush()
+        return stream.getvalue()
+
+    def test_records_are_fixed_size_and_relative_to_the_first_input(self):
+        data = self.record_session()
+
+        assert header.size + 7 * record.size == len(data)
+        records = list(read_recording(io.BytesIO(data)))
+        assert (0.0, 7) == (records[0][0], len(records))
+        assert (0.016, MOTION, 12, 30, 0) == records[1]
+        assert (0.5, PRESS, 1, 0, 10) == records[2]
+        assert HOTKEY == records[4][1]
+
+    def test_replay_reproduces_the_session(self):
+        _, original = self.make_gui()
+        session(original)
+
+        statechart, replayed = self.make_gui()
+        count = replay(read_recording(io.BytesIO(self.record_session())), replayed)
+
+        assert 7 == count
+        assert original.calls == replayed.calls
+        assert statechart.state.fun is vertical_state
+
+    def test_realtime_replay_waits_for_recorded_times(self):
+        clock = FakeClock()
+        pumped = []
+        _, gui = self.make_gui()
+
+        replay(read_recording(io.BytesIO(self.record_session())), gui, realtime=True, pump=lambda: pumped.append(clock.now), clock=clock, sleep=clock.sleep)
+
+        assert 2.0 <= clock.now < 2.002
+        assert len(pumped) > 7
+
+    def test_truncated_log_is_read_up_to_the_last_whole_record(self):
+        data = self.record_session()
+
+        assert 6 == len(list(read_recording(io.BytesIO(data[:-3]))))
+
+    def test_foreign_files_are_rejected(self):
+        with self.assertRaises(ValueError):
+            list(read_recording(io.BytesIO(b'[\"MOVE\", null]\n')))
+
+
+if __name__ == '__main__':
+    unittest.main()
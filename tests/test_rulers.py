@@ -0,0 +1,110 @@
+import unittest
+
+from miros import signals
+
+from screenuler.app import RulerGroup
+from screenuler.app import TestableGui
+from screenuler.app import horizontal_state
+from screenuler.app import vertical_state
+
+
+class CountingGui(TestableGui):
+    def __init__(self, bus, on_quit):
+        super().__init__(bus=bus)
+        self.on_quit = on_quit
+        self.flushes = 0
+        self.work = 1
+        self.destroyed = False
+
+    def quit(self):
+        self.on_quit(self)
+
+    def flush(self) -> int:
+        self.flushes += 1
+        return self.work
+
+    def destroy(self):
+        self.destroyed = True
+
+
+class TestRulerGroup(unittest.TestCase):
+    def setUp(self):
+        self.scheduled = []
+        self.emptied = []
+        self.group = RulerGroup(make_gui=CountingGui, schedule=lambda delay, callback: self.scheduled.append(callback), on_empty=lambda: self.emptied.append(True))
+
+    def test_rulers_have_independent_state(self):
+        horizontal = self.group.add()
+        vertical = self.group.add('vertical')
+
+        assert (1, 2) == (horizontal.id, vertical.id)
+        assert horizontal.statechart.state.fun is horizontal_state
+        assert vertical.statechart.state.fun is vertical_state
+        assert horizontal.gui.bus is not vertical.gui.bus
+
+    def test_one_frame_loop_flushes_every_ruler(self):
+        rulers = [self.group.add() for _ in range(3)]
+
+        self.group.start()
+        self.scheduled.pop()()
+
+        assert [2, 2, 2] == [ruler.gui.flushes for ruler in rulers]
+        assert 1 == len(self.scheduled)
+        assert 2 == self.group.frame_pacer.frames
+
+    def test_frame_loop_stops_when_idle_and_restarts_when_dirty(self):
+        ruler = self.group.add()
+        ruler.gui.work = 0
+
+        self.group.start()
+
+        assert [] == self.scheduled
+        assert not self.group.frame_scheduled
+
+        ruler.gui.on_dirty()
+        ruler.gui.on_dirty()
+
+        assert 1 == len(self.scheduled)
+        ruler.gui.work = 1
+        self.scheduled.pop()()
+        assert 1 == len(self.scheduled)
+
+    def test_window_and_statechart_phases_are_reported_separately(self):
+        events = []
+
+        def make_gui(bus, on_quit):
+            events.append('make_gui')
+            return CountingGui(bus, on_quit)
+
+        group = RulerGroup(make_gui=make_gui, schedule=lambda delay, callback: None, on_phase=events.append)
+        group.add('vertical')
+
+        assert ['make_gui', 'tk init', 'statechart'] == events
+
+    def test_shutdown_removes_only_that_ruler(self):
+        first = self.group.add()
+        second = self.group.add()
+
+        first.gui.send_event(signal=signals.SHUTDOWN)
+
+        assert first.gui.destroyed
+        assert [2] == list(self.group.rulers)
+        assert second is self.group.get()
+        assert [] == self.emptied
+
+        second.gui.send_event(signal=signals.SHUTDOWN)
+
+        assert [True] == self.emptied
+
+    def test_get_defaults_to_latest_ruler(self):
+        assert self.group.get() is None
+
+        self.group.add()
+        latest = self.group.add()
+
+        assert latest is self.group.get()
+        assert self.group.get(3) is None
+
+
+if __name__ == '__main__':
+    unittest.main()
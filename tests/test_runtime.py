@@ -0,0 +1,114 @@
+import asyncio
+import unittest
+
+from miros import Event
+from miros import signals
+
+from screenuler.app import GlobalBus
+from screenuler.app import Statechart
+from screenuler.app import TestableGui
+from screenuler.app import horizontal_state
+from screenuler.app import init_state
+from screenuler.app import vertical_state
+from screenuler.runtime import AsyncioRuntime
+
+
+class FakeTk:
+    def __init__(self):
+        self.pending = []
+
+    def dooneevent(self, flags: int) -> int:
+        if not self.pending:
+            return 0
+        self.pending.pop(0)()
+        return 1
+
+
+class FakeRoot:
+    def __init__(self):
+        self.tk = FakeTk()
+
+
+class TestAsyncioRuntime(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+        self.runtime = AsyncioRuntime(self.root, poll_interval=0, max_events=4)
+
+    def tearDown(self):
+        self.runtime.close()
+
+    def test_pump_handles_a_bounded_batch_of_tk_events(self):
+        handled = []
+        self.root.tk.pending = [lambda i=i: handled.append(i) for i in range(10)]
+
+        assert 4 == self.runtime.pump_tk()
+        assert 4 == self.runtime.pump_tk()
+        assert 2 == self.runtime.pump_tk()
+        assert list(range(10)) == handled
+
+    def test_timers_and_tk_events_run_until_quit(self):
+        handled = []
+        self.root.tk.pending = [lambda: handled.append('tk')]
+        self.runtime.call_soon(lambda: handled.append('soon'))
+        self.runtime.schedule(5, self.runtime.quit)
+
+        self.runtime.run()
+
+        assert {'tk', 'soon'} == set(handled)
+        assert 1 == self.runtime.stats()['tk_events']
+
+    def test_poll_interval_backs_off_while_idle_and_resets_on_input(self):
+        runtime = AsyncioRuntime(FakeRoot(), poll_interval=0.004, max_poll_interval=0.025, max_events=4)
+
+        assert [0.008, 0.016, 0.025, 0.025] == [runtime.next_interval(0) for _ in range(4)]
+        assert 0.004 == runtime.next_interval(1)
+        assert 0 == runtime.next_interval(4)
+        runtime.close()
+
+    def test_loop_callbacks_pump_tk_right_after_they_run(self):
+        handled = []
+        self.runtime.interval = 0.025
+        self.runtime.call_soon(lambda: self.root.tk.pending.append(lambda: handled.append('redraw')))
+        self.runtime.call_soon(self.runtime.quit)
+
+        self.runtime.loop.run_until_complete(asyncio.sleep(0))
+
+        assert ['redraw'] == handled
+        assert 0 == self.runtime.interval
+
+
+class TestStatechartOnLoop(unittest.TestCase):
+    def setUp(self):
+        self.runtime = AsyncioRuntime(FakeRoot(), poll_interval=0)
+        bus = GlobalBus()
+        self.statechart = Statechart('loop', bus=bus, instrumented=False, synchronous=True, call_soon=self.runtime.call_soon)
+        self.gui = TestableGui(bus=bus)
+        self.statechart.start_at(init_state)
+
+    def tearDown(self):
+        self.runtime.close()
+
+    def test_posted_events_are_dispatched_on_the_loop(self):
+        self.gui.send_event(signal=signals.TOGGLE_ORIENTATION)
+
+        assert self.statechart.state.fun is horizontal_state
+
+        self.runtime.call_soon(self.runtime.quit)
+        self.runtime.run()
+
+        assert self.statechart.state.fun is vertical_state
+
+    def test_a_burst_is_drained_in_one_callback(self):
+        scheduled = []
+        self.statechart.call_soon = scheduled.append
+
+        for _ in range(3):
+            self.statechart.post_fifo(Event(signal=signals.TOGGLE_ORIENTATION))
+
+        assert 1 == len(scheduled)
+        scheduled.pop()()
+        assert self.statechart.state.fun is vertical_state
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import subprocess
+import sys
+import unittest
+
+from screenuler.startup import StartupProfile
+
+
+class FakeClock:
+    def __init__(self, *times):
+        self.times = list(times)
+
+    def __call__(self):
+        return self.times.pop(0)
+
+
+class TestStartupProfile(unittest.TestCase):
+    def test_phases_are_measured_from_previous_mark(self):
+        profile = StartupProfile(clock=FakeClock(0.0, 0.1, 0.15, 0.4))
+        profile.mark('imports')
+        profile.mark('tk init')
+        profile.mark('first paint')
+
+        assert ['imports', 'tk init', 'first paint'] == [phase for phase, _ in profile.phases]
+        assert abs(profile.phases[2][1] - 0.25) < 1e-9
+        assert abs(profile.total() - 0.4) < 1e-9
+
+    def test_report_lists_every_phase_and_total(self):
+        profile = StartupProfile(clock=FakeClock(0.0, 0.002))
+        profile.mark('imports')
+
+        assert '     imports:      2.0 ms\n       total:      2.0 ms' == profile.report()
+
+
+class TestStartupImports(unittest.TestCase):
+    def test_snapping_and_screen_capture_are_not_imported_with_the_app(self):
+        code = 'import sys, screenuler.app; print(sorted({"screenuler.edges", "numpy", "PIL"} & set(sys.modules)))'
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+
+        assert '[]' == output.strip()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,10 @@
-import time
 import unittest
 
 from screenuler.app import Statechart
 from screenuler.app import GlobalBus
 from screenuler.app import TestableGui
 from screenuler.app import init_state
+from screenuler.app import vertical_state
 from screenuler.app import MoveEventPayload
 
 from miros import stripped
@@ -49,7 +49,7 @@ class TestStates(unittest.TestCase):
         '''
 
         self.statechart.post_fifo(Event(signal=signals.TOGGLE_ORIENTATION))
-        time.sleep(0.1)
+        self.statechart.drain()
 
         actual_trace = self.statechart.trace()
 
@@ -64,7 +64,7 @@ class TestStates(unittest.TestCase):
 
         self.statechart.post_fifo(Event(signal=signals.TOGGLE_ORIENTATION))
         self.statechart.post_fifo(Event(signal=signals.TOGGLE_ORIENTATION))
-        time.sleep(0.1)
+        self.statechart.drain()
 
         actual_trace = self.statechart.trace()
 
@@ -75,7 +75,7 @@ class TestStates(unittest.TestCase):
         self.statechart.post_fifo(Event(signal=signals.SET_SIZE_2))
         self.statechart.post_fifo(Event(signal=signals.SET_SIZE_3))
 
-        time.sleep(0.1)
+        self.statechart.drain()
 
         expected_spy = ['START', 'SEARCH_FOR_SUPER_SIGNAL:init_state', 'ENTRY_SIGNAL:init_state', 'INIT_SIGNAL:init_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:horizontal_state', 'INIT_SIGNAL:horizontal_state', '<- Queued:(0) Deferred:(0)', 'SET_SIZE_1:horizontal_state', 'SET_SIZE_1:horizontal_state:HOOK', '<- Queued:(2) Deferred:(0)', 'SET_SIZE_2:horizontal_state', 'SET_SIZE_2:horizontal_state:HOOK', '<- Queued:(1) Deferred:(0)', 'SET_SIZE_3:horizontal_state', 'SET_SIZE_3:horizontal_state:HOOK', '<- Queued:(0) Deferred:(0)']
         actual_spy = self.statechart.spy()
@@ -88,7 +88,7 @@ class TestStates(unittest.TestCase):
         self.statechart.post_fifo(Event(signal=signals.SET_SIZE_2))
         self.statechart.post_fifo(Event(signal=signals.SET_SIZE_3))
 
-        time.sleep(0.1)
+        self.statechart.drain()
 
         expected_spy = ['START', 'SEARCH_FOR_SUPER_SIGNAL:init_state', 'ENTRY_SIGNAL:init_state', 'INIT_SIGNAL:init_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:horizontal_state', 'INIT_SIGNAL:horizontal_state', '<- Queued:(0) Deferred:(0)', 'TOGGLE_ORIENTATION:horizontal_state', 'SEARCH_FOR_SUPER_SIGNAL:vertical_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'EXIT_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:vertical_state', 'INIT_SIGNAL:vertical_state', '<- Queued:(3) Deferred:(0)', 'SET_SIZE_1:vertical_state', 'SET_SIZE_1:vertical_state:HOOK', '<- Queued:(2) Deferred:(0)', 'SET_SIZE_2:vertical_state', 'SET_SIZE_2:vertical_state:HOOK', '<- Queued:(1) Deferred:(0)', 'SET_SIZE_3:vertical_state', 'SET_SIZE_3:vertical_state:HOOK', '<- Queued:(0) Deferred:(0)']
         actual_spy = self.statechart.spy()
@@ -102,11 +102,45 @@ class TestStates(unittest.TestCase):
         self.assert_spies(expected_spy, actual_spy)
         self.assert_traces(expected_trace, actual_trace)
 
+    def test_statechart_full_size_signal_in_horizontal_state(self):
+        self.statechart.post_fifo(Event(signal=signals.SET_SIZE_4))
+
+        self.statechart.drain()
+
+        expected_spy = ['START', 'SEARCH_FOR_SUPER_SIGNAL:init_state', 'ENTRY_SIGNAL:init_state', 'INIT_SIGNAL:init_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:horizontal_state', 'INIT_SIGNAL:horizontal_state', '<- Queued:(0) Deferred:(0)', 'SET_SIZE_4:horizontal_state', 'SET_SIZE_4:horizontal_state:HOOK', '<- Queued:(0) Deferred:(0)']
+        actual_spy = self.statechart.spy()
+
+        self.assert_spies(expected_spy, actual_spy)
+
+    def test_statechart_cycle_unit_signal_is_handled_in_both_orientations(self):
+        self.statechart.post_fifo(Event(signal=signals.CYCLE_UNIT))
+        self.statechart.post_fifo(Event(signal=signals.TOGGLE_ORIENTATION))
+        self.statechart.post_fifo(Event(signal=signals.CYCLE_UNIT))
+
+        self.statechart.drain()
+
+        expected_spy = ['START', 'SEARCH_FOR_SUPER_SIGNAL:init_state', 'ENTRY_SIGNAL:init_state', 'INIT_SIGNAL:init_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:horizontal_state', 'INIT_SIGNAL:horizontal_state', '<- Queued:(0) Deferred:(0)', 'CYCLE_UNIT:horizontal_state', 'CYCLE_UNIT:init_state', 'CYCLE_UNIT:init_state:HOOK', '<- Queued:(2) Deferred:(0)', 'TOGGLE_ORIENTATION:horizontal_state', 'SEARCH_FOR_SUPER_SIGNAL:vertical_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'EXIT_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:vertical_state', 'INIT_SIGNAL:vertical_state', '<- Queued:(1) Deferred:(0)', 'CYCLE_UNIT:vertical_state', 'CYCLE_UNIT:init_state', 'CYCLE_UNIT:init_state:HOOK', '<- Queued:(0) Deferred:(0)']
+        actual_spy = self.statechart.spy()
+
+        self.assert_spies(expected_spy, actual_spy)
+
+    def test_statechart_toggle_snap_signal_is_handled_in_both_orientations(self):
+        self.statechart.post_fifo(Event(signal=signals.TOGGLE_SNAP))
+        self.statechart.post_fifo(Event(signal=signals.TOGGLE_ORIENTATION))
+        self.statechart.post_fifo(Event(signal=signals.TOGGLE_SNAP))
+
+        self.statechart.drain()
+
+        expected_spy = ['START', 'SEARCH_FOR_SUPER_SIGNAL:init_state', 'ENTRY_SIGNAL:init_state', 'INIT_SIGNAL:init_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:horizontal_state', 'INIT_SIGNAL:horizontal_state', '<- Queued:(0) Deferred:(0)', 'TOGGLE_SNAP:horizontal_state', 'TOGGLE_SNAP:horizontal_state:HOOK', '<- Queued:(2) Deferred:(0)', 'TOGGLE_ORIENTATION:horizontal_state', 'SEARCH_FOR_SUPER_SIGNAL:vertical_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'EXIT_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:vertical_state', 'INIT_SIGNAL:vertical_state', '<- Queued:(1) Deferred:(0)', 'TOGGLE_SNAP:vertical_state', 'TOGGLE_SNAP:vertical_state:HOOK', '<- Queued:(0) Deferred:(0)']
+        actual_spy = self.statechart.spy()
+
+        self.assert_spies(expected_spy, actual_spy)
+
     def test_statechart_2_move_signals_in_horizontal_state(self):
         self.statechart.post_fifo(Event(signal=signals.MOVE, payload=MoveEventPayload(direction=(0, 0), speedup=False)))
         self.statechart.post_fifo(Event(signal=signals.MOVE, payload=MoveEventPayload(direction=(0, 0), speedup=False)))
 
-        time.sleep(0.1)
+        self.statechart.drain()
 
         expected_spy = ['START', 'SEARCH_FOR_SUPER_SIGNAL:init_state', 'ENTRY_SIGNAL:init_state', 'INIT_SIGNAL:init_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:horizontal_state', 'INIT_SIGNAL:horizontal_state', '<- Queued:(0) Deferred:(0)', 'MOVE:horizontal_state', 'MOVE:init_state', 'MOVE:init_state:HOOK', '<- Queued:(1) Deferred:(0)', 'MOVE:horizontal_state', 'MOVE:init_state', 'MOVE:init_state:HOOK', '<- Queued:(0) Deferred:(0)']
         actual_spy = self.statechart.spy()
@@ -118,7 +152,7 @@ class TestStates(unittest.TestCase):
         self.statechart.post_fifo(Event(signal=signals.MOVE, payload=MoveEventPayload(direction=(0, 0), speedup=False)))
         self.statechart.post_fifo(Event(signal=signals.MOVE, payload=MoveEventPayload(direction=(0, 0), speedup=False)))
 
-        time.sleep(0.1)
+        self.statechart.drain()
 
         expected_spy = ['START', 'SEARCH_FOR_SUPER_SIGNAL:init_state', 'ENTRY_SIGNAL:init_state', 'INIT_SIGNAL:init_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:horizontal_state', 'INIT_SIGNAL:horizontal_state', '<- Queued:(0) Deferred:(0)', 'TOGGLE_ORIENTATION:horizontal_state', 'SEARCH_FOR_SUPER_SIGNAL:vertical_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'EXIT_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:vertical_state', 'INIT_SIGNAL:vertical_state', '<- Queued:(2) Deferred:(0)', 'MOVE:vertical_state', 'MOVE:init_state', 'MOVE:init_state:HOOK', '<- Queued:(1) Deferred:(0)', 'MOVE:vertical_state', 'MOVE:init_state', 'MOVE:init_state:HOOK', '<- Queued:(0) Deferred:(0)']
         actual_spy = self.statechart.spy()
@@ -128,7 +162,7 @@ class TestStates(unittest.TestCase):
     def test_statechart_shutdown_signal_in_horizontal_state(self):
         self.statechart.post_fifo(Event(signal=signals.SHUTDOWN))
 
-        time.sleep(0.1)
+        self.statechart.drain()
 
         expected_spy = ['START', 'SEARCH_FOR_SUPER_SIGNAL:init_state', 'ENTRY_SIGNAL:init_state', 'INIT_SIGNAL:init_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:horizontal_state', 'INIT_SIGNAL:horizontal_state', '<- Queued:(0) Deferred:(0)', 'SHUTDOWN:horizontal_state', 'SHUTDOWN:init_state', 'SHUTDOWN:init_state:HOOK', '<- Queued:(0) Deferred:(0)']
         actual_spy = self.statechart.spy()
@@ -145,7 +179,7 @@ class TestStates(unittest.TestCase):
         self.statechart.post_fifo(Event(signal=signals.TOGGLE_ORIENTATION))
         self.statechart.post_fifo(Event(signal=signals.SHUTDOWN))
 
-        time.sleep(0.1)
+        self.statechart.drain()
 
         expected_spy = ['START', 'SEARCH_FOR_SUPER_SIGNAL:init_state', 'ENTRY_SIGNAL:init_state', 'INIT_SIGNAL:init_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:horizontal_state', 'INIT_SIGNAL:horizontal_state', '<- Queued:(0) Deferred:(0)', 'TOGGLE_ORIENTATION:horizontal_state', 'SEARCH_FOR_SUPER_SIGNAL:vertical_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'EXIT_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:vertical_state', 'INIT_SIGNAL:vertical_state', '<- Queued:(1) Deferred:(0)', 'SHUTDOWN:vertical_state', 'SHUTDOWN:init_state', 'SHUTDOWN:init_state:HOOK', '<- Queued:(0) Deferred:(0)']
         actual_spy = self.statechart.spy()
@@ -162,7 +196,7 @@ class TestStates(unittest.TestCase):
     def test_statechart_pointer_moved_signal_in_horizontal_state(self):
         self.statechart.post_fifo(Event(signal=signals.POINTER_MOVED, payload=(0, 0)))
 
-        time.sleep(0.1)
+        self.statechart.drain()
 
         expected_spy = ['START', 'SEARCH_FOR_SUPER_SIGNAL:init_state', 'ENTRY_SIGNAL:init_state', 'INIT_SIGNAL:init_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:horizontal_state', 'INIT_SIGNAL:horizontal_state', '<- Queued:(0) Deferred:(0)', 'POINTER_MOVED:horizontal_state', 'POINTER_MOVED:horizontal_state:HOOK', '<- Queued:(0) Deferred:(0)']
 
@@ -174,7 +208,7 @@ class TestStates(unittest.TestCase):
         self.statechart.post_fifo(Event(signal=signals.TOGGLE_ORIENTATION))
         self.statechart.post_fifo(Event(signal=signals.POINTER_MOVED, payload=(0, 0)))
 
-        time.sleep(0.1)
+        self.statechart.drain()
 
         expected_spy = ['START', 'SEARCH_FOR_SUPER_SIGNAL:init_state', 'ENTRY_SIGNAL:init_state', 'INIT_SIGNAL:init_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:horizontal_state', 'INIT_SIGNAL:horizontal_state', '<- Queued:(0) Deferred:(0)', 'TOGGLE_ORIENTATION:horizontal_state', 'SEARCH_FOR_SUPER_SIGNAL:vertical_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'EXIT_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:vertical_state', 'INIT_SIGNAL:vertical_state', '<- Queued:(1) Deferred:(0)', 'POINTER_MOVED:vertical_state', 'POINTER_MOVED:vertical_state:HOOK', '<- Queued:(0) Deferred:(0)']
 
@@ -183,5 +217,63 @@ class TestStates(unittest.TestCase):
         self.assert_spies(expected_spy, actual_spy)
 
 
+class TestStatechartInstrumentation(unittest.TestCase):
+    def test_production_statechart_records_no_spy_or_trace(self):
+        bus = GlobalBus()
+        statechart = Statechart('statechart', bus=bus, instrumented=False)
+        TestableGui(bus=bus)
+        statechart.start_at(init_state)
+
+        statechart.post_fifo(Event(signal=signals.TOGGLE_ORIENTATION))
+        statechart.post_fifo(Event(signal=signals.POINTER_MOVED, payload=(0, 0)))
+        statechart.drain()
+
+        assert statechart.state.fun is vertical_state
+        assert statechart.spy() is None
+        assert statechart.trace() is None
+
+    def test_spy_size_bounds_spy_log(self):
+        bus = GlobalBus()
+        statechart = Statechart('statechart', bus=bus, spy_size=10)
+        TestableGui(bus=bus)
+        statechart.start_at(init_state)
+
+        for _ in range(20):
+            statechart.post_fifo(Event(signal=signals.POINTER_MOVED, payload=(0, 0)))
+        statechart.drain()
+
+        assert 10 == len(statechart.spy())
+
+
+class TestSynchronousStatechart(unittest.TestCase):
+    def setUp(self):
+        bus = GlobalBus()
+        self.statechart = Statechart('statechart', bus=bus, synchronous=True)
+        TestableGui(bus=bus)
+
+        self.statechart.start_at(init_state)
+
+    def test_posted_event_runs_to_completion_immediately(self):
+        self.statechart.post_fifo(Event(signal=signals.TOGGLE_ORIENTATION))
+
+        assert self.statechart.state.fun is vertical_state
+        assert 0 == len(self.statechart.queue)
+
+    def test_statechart_change_size_signals_in_vertical_state(self):
+        self.statechart.post_fifo(Event(signal=signals.TOGGLE_ORIENTATION))
+        self.statechart.post_fifo(Event(signal=signals.SET_SIZE_1))
+        self.statechart.post_fifo(Event(signal=signals.SET_SIZE_2))
+
+        expected_spy = ['START', 'SEARCH_FOR_SUPER_SIGNAL:init_state', 'ENTRY_SIGNAL:init_state', 'INIT_SIGNAL:init_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:horizontal_state', 'INIT_SIGNAL:horizontal_state', '<- Queued:(0) Deferred:(0)', 'TOGGLE_ORIENTATION:horizontal_state', 'SEARCH_FOR_SUPER_SIGNAL:vertical_state', 'SEARCH_FOR_SUPER_SIGNAL:horizontal_state', 'EXIT_SIGNAL:horizontal_state', 'ENTRY_SIGNAL:vertical_state', 'INIT_SIGNAL:vertical_state', '<- Queued:(0) Deferred:(0)', 'SET_SIZE_1:vertical_state', 'SET_SIZE_1:vertical_state:HOOK', '<- Queued:(0) Deferred:(0)', 'SET_SIZE_2:vertical_state', 'SET_SIZE_2:vertical_state:HOOK', '<- Queued:(0) Deferred:(0)']
+        actual_spy = self.statechart.spy()
+
+        TestStates.assert_spies(expected_spy, actual_spy)
+
+    def test_stop_without_thread(self):
+        self.statechart.stop()
+
+        assert self.statechart.thread is None
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,225 @@
+import unittest
+from collections import OrderedDict
+
+from screenuler.app import Gui
+from screenuler.app import TickImageCache
+from screenuler.geometry import WindowGeometry
+from screenuler.layout import tick_layout
+from screenuler.layout import units
+from screenuler.ticks import TickPool
+from screenuler.ticks import aligned_range
+from screenuler.ticks import visible_span
+
+
+class FakeCanvas:
+    def __init__(self):
+        self.items = {}
+        self.created = 0
+
+    def create(self, pos):
+        self.created += 1
+        self.items[self.created] = pos
+        return self.created
+
+    def place(self, item, pos):
+        self.items[item] = pos
+
+    def hide(self, item):
+        self.items[item] = None
+
+    def visible(self):
+        return sorted(pos for pos in self.items.values() if pos is not None)
+
+
+class TestTicks(unittest.TestCase):
+    def test_visible_span(self):
+        assert (0, 250) == visible_span(0, 250, 1920)
+        assert (0, 1820) == visible_span(100, 8000, 1920)
+        assert (3000, 4920) == visible_span(-3000, 8000, 1920)
+        assert (2950, 4970) == visible_span(-3000, 8000, 1920, margin=50)
+        assert (0, 0) == visible_span(2000, 8000, 1920)
+
+    def test_aligned_range(self):
+        assert [10, 20, 30] == list(aligned_range(5, 30, 10))
+        assert [0, 50] == list(aligned_range(0, 99, 50))
+
+
+class TestTickPool(unittest.TestCase):
+    def setUp(self):
+        self.canvas = FakeCanvas()
+        self.pool = TickPool(create=self.canvas.create, place=self.canvas.place, hide=self.canvas.hide)
+
+    def test_render_creates_items_for_positions(self):
+        self.pool.render(range(0, 50, 10))
+
+        assert [0, 10, 20, 30, 40] == self.canvas.visible()
+        assert 5 == len(self.pool)
+
+    def test_panning_recycles_items_and_keeps_count_flat(self):
+        self.pool.render(range(0, 100, 10))
+
+        for start in range(0, 10000, 30):
+            self.pool.render(range(start, start + 100, 10))
+
+        assert list(range(9990, 10090, 10)) == self.canvas.visible()
+        assert 10 == self.canvas.created
+
+    def test_shrinking_hides_unused_items(self):
+        self.pool.render(range(0, 100, 10))
+        self.pool.render(range(0, 30, 10))
+
+        assert [0, 10, 20] == self.canvas.visible()
+        assert 10 == len(self.pool)
+
+    def test_clear_hides_everything(self):
+        self.pool.render(range(0, 100, 10))
+        self.pool.clear()
+
+        assert [] == self.canvas.visible()
+
+    def test_drain_hands_back_every_item_and_empties_the_pool(self):
+        self.pool.render(range(0, 100, 10))
+        self.pool.render(range(0, 30, 10))
+
+        assert list(range(1, 11)) == sorted(self.pool.drain())
+        assert 0 == len(self.pool)
+
+
+class CountingImageCache(TickImageCache):
+    def __init__(self, max_size: int = 32):
+        super().__init__(master=None, max_size=max_size)
+        self.rendered = []
+
+    def _render(self, layout, direction, color):
+        self.rendered.append(layout.key)
+        return object()
+
+
+class TestTickImageCache(unittest.TestCase):
+    def test_equal_layouts_share_one_image_after_the_layout_cache_is_rebuilt(self):
+        cache = CountingImageCache()
+        image = cache.get(tick_layout(400, 'mm', dpi=96), 'horizontal', 'black')
+        tick_layout.cache_clear()
+
+        assert image is cache.get(tick_layout(400, 'mm', dpi=96), 'horizontal', 'black')
+        assert 1 == len(cache.rendered)
+
+    def test_cache_never_holds_more_than_max_size_images(self):
+        cache = CountingImageCache(max_size=4)
+        first = tick_layout(100, 'px')
+
+        for length in range(100, 110):
+            cache.get(tick_layout(length, 'px'), 'horizontal', 'black')
+            assert len(cache.images) <= 4
+
+        cache.get(first, 'horizontal', 'black')
+
+        assert 11 == len(cache.rendered)
+
+
+class FakeTkCanvas:
+    def __init__(self):
+        self.items = {}
+        self.next_id = 0
+
+    def _create(self, tags=None, state='normal', **_):
+        self.next_id += 1
+        self.items[self.next_id] = {'tags': set() if tags is None else {tags}, 'state': state}
+        return self.next_id
+
+    def create_image(self, *coords, **options):
+        return self._create(**options)
+
+    def create_text(self, *coords, **options):
+        return self._create(**options)
+
+    def create_rectangle(self, *coords, **options):
+        return self._create(**options)
+
+    def _matching(self, tag_or_id):
+        if isinstance(tag_or_id, int):
+            return [tag_or_id] if tag_or_id in self.items else []
+        return [item for item, info in self.items.items() if item == tag_or_id or tag_or_id in info['tags']]
+
+    def itemconfigure(self, tag_or_id, state=None, **_):
+        for item in self._matching(tag_or_id):
+            if state is not None:
+                self.items[item]['state'] = state
+
+    def coords(self, item, *coords):
+        pass
+
+    def delete(self, *tags_or_ids):
+        for tag_or_id in tags_or_ids:
+            for item in self._matching(tag_or_id):
+                del self.items[item]
+
+    def find_all(self):
+        return tuple(self.items)
+
+
+class HeadlessGui(Gui):
+    def __init__(self):
+        self.canvas = FakeTkCanvas()
+        self.tick_images = CountingImageCache(max_size=6)
+        self.tick_layers = OrderedDict()
+        self.tick_layer_images = {}
+        self.visible_tick_layer = None
+        self.visible_tick_size = None
+        self.unit = 'px'
+        self.dpi = 96
+        self.zoom = 1.0
+        self.tick_step = 10
+        self.length = 0
+        self.mark_color = 'black'
+        self.persistent_markers = True
+        self.position_marker = None
+        self.geometry = WindowGeometry(250, 75, 0, 0)
+        self.screen_size = (2000, 2000)
+
+
+class TestTickLayers(unittest.TestCase):
+    def setUp(self):
+        self.gui = HeadlessGui()
+
+    def cycle(self, rounds: int):
+        for _ in range(rounds):
+            for direction in ('horizontal', 'vertical'):
+                for size in (1, 2, 3, Gui.full_size):
+                    self.gui._show_tick_layer(self.gui._ruler_size(size, direction)[0], size, direction)
+                    for _ in units:
+                        self.gui.cycle_unit()
+
+    def test_switching_sizes_and_units_keeps_canvas_items_bounded(self):
+        self.cycle(1)
+        items = len(self.gui.canvas.find_all())
+
+        self.cycle(3)
+
+        assert len(self.gui.tick_layers) <= Gui.max_tick_layers
+        assert set(self.gui.tick_layer_images) <= set(self.gui.tick_layers)
+        assert len(self.gui.canvas.find_all()) <= items
+        assert len(self.gui.tick_images.images) <= self.gui.tick_images.max_size
+
+    def test_visible_layer_survives_eviction(self):
+        self.gui._show_tick_layer(2000, Gui.full_size, 'horizontal')
+        visible = self.gui.visible_tick_layer
+
+        for length in range(100, 100 + 2 * Gui.max_tick_layers):
+            self.gui._build_tick_layer(f'extra-{length}', length, state='hidden')
+
+        assert visible in self.gui.tick_layers
+        assert len(self.gui.tick_layers) == Gui.max_tick_layers
+        assert any(info['state'] == 'normal' for info in self.gui.canvas.items.values())
+
+    def test_evicted_static_layers_delete_their_items(self):
+        for length in range(100, 100 + Gui.max_tick_layers + 1):
+            self.gui._build_tick_layer(f'extra-{length}', length, state='hidden')
+
+        assert 'extra-100' not in self.gui.tick_layers
+        assert 'extra-100' not in self.gui.tick_layer_images
+        assert not self.gui.canvas._matching('extra-100')
+
+
+if __name__ == '__main__':
+    unittest.main()